@@ -4,7 +4,7 @@ Knowledge Base utilities for MASO applications
 Provides:
 - KnowledgeService: Unified facade for search and context building (main entry point)
 - KBDiffService: Compare KB content and generate structured diffs
-- KBSearchEngine: Stateless search engine for KB content  
+- KBSearchEngine: Indexed search engine for KB content
 - LLMContextBuilder: Build context strings for LLM prompts
 - QueryAnalyzer: Analyze queries for signals and categories
 - Context Modules: Pluggable modules for context building
@@ -40,7 +40,7 @@ from .modules import (
 )
 
 # Search engine
-from .search import KBSearchEngine, get_search_engine, extract_relevant_excerpt
+from .search import KBSearchEngine, QueryPlan, get_search_engine, extract_relevant_excerpt
 
 # Context builder (legacy, use KnowledgeService instead)
 from .context import LLMContextBuilder, get_context_builder
@@ -126,6 +126,7 @@ __all__ = [
     
     # Search
     "KBSearchEngine",
+    "QueryPlan",
     "get_search_engine",
     "extract_relevant_excerpt",
     
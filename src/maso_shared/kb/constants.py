@@ -11,7 +11,7 @@ These constants are used by both Voice AI and Main App for:
 # STOPWORDS - Dutch filler words to filter out during search
 # ============================================================================
 
-STOPWORDS = {
+STOPWORDS = frozenset({
     # Articles & determiners
     'de', 'het', 'een', 'en', 'van', 'in', 'op', 'te', 'is', 'voor', 'dat', 'die',
     'aan', 'met', 'als', 'of', 'er', 'zijn', 'was', 'heeft', 'bij', 'naar', 'om',
@@ -32,10 +32,10 @@ STOPWORDS = {
     # Question words (for excerpt extraction)
     'ja', 'nee', 'hebben', 'weten', 'zien', 'kijken', 'komen', 'gaan', 'doen', 'maken',
     'iets', 'alles', 'niets', 'veel', 'weinig', 'beetje', 'details', 'informatie', 'info',
-}
+})
 
 # Extended stopwords for excerpt extraction (includes English)
-STOPWORDS_EXTENDED = STOPWORDS | {
+STOPWORDS_EXTENDED = STOPWORDS | frozenset({
     # English stopwords (for multilingual)
     'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
     'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
@@ -43,7 +43,7 @@ STOPWORDS_EXTENDED = STOPWORDS | {
     'i', 'you', 'he', 'she', 'it', 'we', 'they', 'my', 'your',
     'what', 'which', 'who', 'where', 'when', 'why', 'how',
     'this', 'that', 'these', 'those', 'some', 'any', 'all',
-}
+})
 
 
 # ============================================================================
@@ -111,32 +111,32 @@ QUERY_EXPANSIONS = {
 # ============================================================================
 
 # Kids/children related queries
-KIDS_QUERY_KEYWORDS = {'kind', 'kinderen', 'kids', 'kleintjes', 'peuter', 'peuters', 'kleuter',
-                       'kleuters', 'baby', 'babies', 'tiener', 'tieners', 'jeugd', 'jong',
-                       'gezin', 'familie', 'ouders', 'kindermenu', 'kinderkaart'}
+KIDS_QUERY_KEYWORDS = frozenset({'kind', 'kinderen', 'kids', 'kleintjes', 'peuter', 'peuters', 'kleuter',
+                                 'kleuters', 'baby', 'babies', 'tiener', 'tieners', 'jeugd', 'jong',
+                                 'gezin', 'familie', 'ouders', 'kindermenu', 'kinderkaart'})
 
-KIDS_CONTENT_KEYWORDS = {'kind', 'kinderen', 'kids', 'kleintjes', 'peuter', 'kleuter', 'baby',
-                         'minimumleeftijd', 'leeftijd', 'jaar oud', 'vanaf jaar', 'toegestaan vanaf'}
+KIDS_CONTENT_KEYWORDS = frozenset({'kind', 'kinderen', 'kids', 'kleintjes', 'peuter', 'kleuter', 'baby',
+                                   'minimumleeftijd', 'leeftijd', 'jaar oud', 'vanaf jaar', 'toegestaan vanaf'})
 
 # Business/corporate related queries
-BEDRIJF_QUERY_KEYWORDS = {'bedrijf', 'zakelijk', 'zakelijke', 'bedrijven', 'teambuilding',
-                          'team', 'teams', 'teamuitje', 'bedrijfsuitje', 'personeelsuitje',
-                          'vergadering', 'meeting', 'conferentie', 'corporate', 'b2b',
-                          'kantoor', 'collega', 'collegas', 'werk', 'afdeling', 'organisatie',
-                          'evenement', 'event', 'groep', 'groepen', 'gezelschap'}
+BEDRIJF_QUERY_KEYWORDS = frozenset({'bedrijf', 'zakelijk', 'zakelijke', 'bedrijven', 'teambuilding',
+                                    'team', 'teams', 'teamuitje', 'bedrijfsuitje', 'personeelsuitje',
+                                    'vergadering', 'meeting', 'conferentie', 'corporate', 'b2b',
+                                    'kantoor', 'collega', 'collegas', 'werk', 'afdeling', 'organisatie',
+                                    'evenement', 'event', 'groep', 'groepen', 'gezelschap'})
 
-BEDRIJF_CONTENT_KEYWORDS = {'bedrijf', 'zakelijk', 'bedrijven', 'teambuilding', 'team',
-                            'teamuitje', 'bedrijfsuitje', 'corporate', 'b2b', 'vergadering',
-                            'evenement', 'groepen', 'groepsarrangement', 'offerte'}
+BEDRIJF_CONTENT_KEYWORDS = frozenset({'bedrijf', 'zakelijk', 'bedrijven', 'teambuilding', 'team',
+                                      'teamuitje', 'bedrijfsuitje', 'corporate', 'b2b', 'vergadering',
+                                      'evenement', 'groepen', 'groepsarrangement', 'offerte'})
 
 # Pricing related queries
-PRICING_QUERY_KEYWORDS = {'prijs', 'prijzen', 'kosten', 'kost', 'tarief', 'tarieven', 'euro',
-                          'geld', 'betalen', 'goedkoop', 'duur', 'budget', 'inclusief',
-                          'inbegrepen', 'extra', 'toeslag', 'korting', 'aanbieding',
-                          'actie', 'deal', 'gratis', 'pp', 'per persoon'}
+PRICING_QUERY_KEYWORDS = frozenset({'prijs', 'prijzen', 'kosten', 'kost', 'tarief', 'tarieven', 'euro',
+                                    'geld', 'betalen', 'goedkoop', 'duur', 'budget', 'inclusief',
+                                    'inbegrepen', 'extra', 'toeslag', 'korting', 'aanbieding',
+                                    'actie', 'deal', 'gratis', 'pp', 'per persoon'})
 
-PRICING_CONTENT_KEYWORDS = {'€', 'euro', 'prijs', 'tarief', 'kost', 'per persoon', 'p.p.',
-                            'inclusief', 'inbegrepen', 'vanaf', 'korting'}
+PRICING_CONTENT_KEYWORDS = frozenset({'€', 'euro', 'prijs', 'tarief', 'kost', 'per persoon', 'p.p.',
+                                      'inclusief', 'inbegrepen', 'vanaf', 'korting'})
 
 
 # ============================================================================
@@ -155,9 +155,9 @@ DRINK_KEYWORDS = {
 }
 
 # All drink keywords flattened for quick lookup
-ALL_DRINK_KEYWORDS = set()
-for keywords in DRINK_KEYWORDS.values():
-    ALL_DRINK_KEYWORDS.update(keywords)
+ALL_DRINK_KEYWORDS = frozenset(
+    keyword for keywords in DRINK_KEYWORDS.values() for keyword in keywords
+)
 
 # Content patterns that indicate a drink section
 DRINK_CONTENT_PATTERNS = ['bier', 'wijn', 'cocktail', 'drankkaart', 'dranken', 'menu', 'tap', 'fles', 'glas', '€']
@@ -168,7 +168,7 @@ DRINK_CONTENT_PATTERNS = ['bier', 'wijn', 'cocktail', 'drankkaart', 'dranken', '
 # ============================================================================
 
 # Allergy query detection
-ALLERGY_QUERY_KEYWORDS = {
+ALLERGY_QUERY_KEYWORDS = frozenset({
     'allergie', 'allergieen', 'allergieën', 'allergisch', 'intolerantie', 'intoleranties',
     'glutenvrij', 'gluten', 'lactosevrij', 'lactose', 'melkvrij', 'zuivelvrij',
     'notenvrij', 'noten', 'pinda', 'pindas', 'pindavrij',
@@ -178,46 +178,46 @@ ALLERGY_QUERY_KEYWORDS = {
     'ei-vrij', 'eivrij', 'eieren', 'schaaldieren', 'schelpdieren', 'vis',
     'soja', 'sojavrij', 'sesamvrij', 'sesam', 'mosterd',
     'kan eten', 'mag eten', 'verdragen', 'niet tegen',
-}
+})
 
 # Content patterns that indicate allergy/diet info
-ALLERGY_CONTENT_KEYWORDS = {
+ALLERGY_CONTENT_KEYWORDS = frozenset({
     'allergie', 'allergenen', 'allergisch', 'intolerantie',
     'glutenvrij', 'lactosevrij', 'melkvrij', 'zuivelvrij', 'notenvrij',
     'vegan', 'veganistisch', 'vegetarisch', 'plantaardig',
     'halal', 'kosher', 'dieet', 'dieetwensen',
     'kan aangepast', 'op verzoek', 'personeel vragen', 'keuken informeren',
     'ingredienten', 'ingrediënten', 'bevat', 'zonder',
-}
+})
 
 
 # ============================================================================
 # RESERVATION SIGNAL KEYWORDS
 # ============================================================================
 
-RESERVATION_QUERY_KEYWORDS = {'reserveren', 'reservering', 'boeken', 'boeking', 'afspraak',
-                              'reservatie', 'vastleggen', 'inplannen', 'beschikbaar',
-                              'beschikbaarheid', 'tafel', 'plek', 'plaats'}
+RESERVATION_QUERY_KEYWORDS = frozenset({'reserveren', 'reservering', 'boeken', 'boeking', 'afspraak',
+                                        'reservatie', 'vastleggen', 'inplannen', 'beschikbaar',
+                                        'beschikbaarheid', 'tafel', 'plek', 'plaats'})
 
 
 # ============================================================================
 # OPENING HOURS KEYWORDS
 # ============================================================================
 
-OPENING_HOURS_KEYWORDS = {'open', 'dicht', 'gesloten', 'openingstijd', 'openingstijden',
-                          'sluitingstijd', 'openingsuren', 'wanneer open', 'hoe laat',
-                          'maandag', 'dinsdag', 'woensdag', 'donderdag', 'vrijdag',
-                          'zaterdag', 'zondag', 'weekend', 'doordeweeks', 'feestdag'}
+OPENING_HOURS_KEYWORDS = frozenset({'open', 'dicht', 'gesloten', 'openingstijd', 'openingstijden',
+                                    'sluitingstijd', 'openingsuren', 'wanneer open', 'hoe laat',
+                                    'maandag', 'dinsdag', 'woensdag', 'donderdag', 'vrijdag',
+                                    'zaterdag', 'zondag', 'weekend', 'doordeweeks', 'feestdag'})
 
 
 # ============================================================================
 # LOCATION KEYWORDS
 # ============================================================================
 
-LOCATION_KEYWORDS = {'adres', 'locatie', 'waar', 'route', 'bereikbaar', 'bereikbaarheid',
-                     'parkeren', 'parkeerplaats', 'ov', 'openbaar vervoer', 'bus', 'tram',
-                     'trein', 'metro', 'fiets', 'auto', 'navigatie', 'straat', 'stad',
-                     'postcode', 'plaats', 'gemeente'}
+LOCATION_KEYWORDS = frozenset({'adres', 'locatie', 'waar', 'route', 'bereikbaar', 'bereikbaarheid',
+                               'parkeren', 'parkeerplaats', 'ov', 'openbaar vervoer', 'bus', 'tram',
+                               'trein', 'metro', 'fiets', 'auto', 'navigatie', 'straat', 'stad',
+                               'postcode', 'plaats', 'gemeente'})
 
 
 # ============================================================================
@@ -234,33 +234,33 @@ PRICING_KEYWORDS = PRICING_QUERY_KEYWORDS
 # ARRANGEMENT KEYWORDS
 # ============================================================================
 
-ARRANGEMENT_KEYWORDS = {
+ARRANGEMENT_KEYWORDS = frozenset({
     'arrangement', 'arrangementen', 'pakket', 'pakketten', 'deal', 'deals',
     'aanbieding', 'aanbiedingen', 'groepsarrangement', 'feest', 'feestje',
     'verjaardag', 'vrijgezellenfeest', 'bedrijfsuitje', 'teamuitje',
-}
+})
 
 
 # ============================================================================
 # GENERAL KEYWORDS
 # ============================================================================
 
-GENERAL_KEYWORDS = {
+GENERAL_KEYWORDS = frozenset({
     'wat', 'hoe', 'waarom', 'wanneer', 'wie', 'welke', 'kunnen', 'mogen',
     'mag', 'kan', 'moet', 'willen', 'graag', 'informatie', 'info', 'vraag',
     'vragen', 'weten', 'vertellen', 'uitleggen',
-}
+})
 
 
 # ============================================================================
 # MENU KEYWORDS
 # ============================================================================
 
-MENU_KEYWORDS = {
+MENU_KEYWORDS = frozenset({
     'menu', 'menukaart', 'kaart', 'eten', 'drinken', 'gerechten', 'hapjes',
     'snacks', 'bites', 'lunch', 'diner', 'ontbijt', 'brunch', 'borrel',
     'borrelhapjes', 'voorgerecht', 'hoofdgerecht', 'nagerecht', 'dessert',
-}
+})
 
 
 # ============================================================================
@@ -284,9 +284,9 @@ DAYS_ORDER = ['maandag', 'dinsdag', 'woensdag', 'donderdag', 'vrijdag', 'zaterda
 # IMPORTANT SEARCH TERMS - For relevance boosting
 # ============================================================================
 
-IMPORTANT_SEARCH_TERMS = {
+IMPORTANT_SEARCH_TERMS = frozenset({
     'prijs', 'kosten', 'tarief', 'euro', 'reserveren', 'boeken', 'open',
     'gesloten', 'adres', 'locatie', 'parkeren', 'kinderen', 'kind', 'kids',
     'menu', 'eten', 'drinken', 'allergie', 'vegan', 'vegetarisch',
     'bedrijf', 'zakelijk', 'groep', 'groepen', 'arrangement',
-}
+})
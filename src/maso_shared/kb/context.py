@@ -11,13 +11,19 @@ Used by both Voice AI and Main App for:
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from functools import lru_cache
+from typing import List, Dict, Any
 
 from .types import KBContent, SearchResult, QuerySignals
 from .constants import DAY_NAMES_EN_TO_NL, DAYS_ORDER
 
 logger = logging.getLogger(__name__)
 
+# Arrangement name/category keywords of the kids and bedrijf modules
+_KIDS_ARRANGEMENT_RE = re.compile(r'kids|kinder|party|feest')
+_BEDRIJF_ARRANGEMENT_RE = re.compile(r'bedrijf|zakelijk|team|corporate')
+
 
 class LLMContextBuilder:
     """
@@ -333,8 +339,7 @@ class LLMContextBuilder:
         
         kids_arrangements = [
             arr for arr in arrangements
-            if any(word in (arr.get('name', '') + arr.get('category', '')).lower() 
-                   for word in ['kids', 'kinder', 'party', 'feest'])
+            if _KIDS_ARRANGEMENT_RE.search((arr.get('name', '') + arr.get('category', '')).lower())
         ]
         
         if not kids_arrangements:
@@ -362,8 +367,7 @@ class LLMContextBuilder:
         
         bedrijf_arrangements = [
             arr for arr in arrangements
-            if any(word in (arr.get('name', '') + arr.get('category', '')).lower() 
-                   for word in ['bedrijf', 'zakelijk', 'team', 'corporate'])
+            if _BEDRIJF_ARRANGEMENT_RE.search((arr.get('name', '') + arr.get('category', '')).lower())
         ]
         
         if not bedrijf_arrangements:
@@ -441,12 +445,7 @@ class LLMContextBuilder:
 # CONVENIENCE FUNCTIONS
 # ============================================================================
 
-_context_builder_instance: Optional[LLMContextBuilder] = None
-
-
+@lru_cache(maxsize=None)
 def get_context_builder() -> LLMContextBuilder:
-    """Get or create a global context builder instance."""
-    global _context_builder_instance
-    if _context_builder_instance is None:
-        _context_builder_instance = LLMContextBuilder()
-    return _context_builder_instance
+    """Get or create a global context builder instance (memoized, thread-safe)."""
+    return LLMContextBuilder()
@@ -14,7 +14,8 @@ import difflib
 import hashlib
 import json
 import logging
-from typing import Dict, Any, List, Tuple, Optional, Set
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Set
 
 from .types import KBContent, DiffChange, DiffSummary, DiffResult
 
@@ -708,12 +709,7 @@ class KBDiffService:
 # SINGLETON INSTANCE
 # ============================================================================
 
-_diff_service_instance: Optional[KBDiffService] = None
-
-
+@lru_cache(maxsize=None)
 def get_diff_service() -> KBDiffService:
-    """Get or create diff service instance"""
-    global _diff_service_instance
-    if _diff_service_instance is None:
-        _diff_service_instance = KBDiffService()
-    return _diff_service_instance
+    """Get or create diff service instance (memoized, thread-safe)"""
+    return KBDiffService()
@@ -15,8 +15,9 @@ Usage:
 """
 
 import logging
+import re
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, FrozenSet
 
 from .search import extract_relevant_excerpt
 from .types import KBContent, SearchResult, QuerySignals
@@ -24,6 +25,10 @@ from .constants import DAY_NAMES_EN_TO_NL, DAYS_ORDER
 
 logger = logging.getLogger(__name__)
 
+# Arrangement name/category keywords of the kids and bedrijf modules
+_KIDS_ARRANGEMENT_RE = re.compile(r'kids|kinder|party|feest')
+_BEDRIJF_ARRANGEMENT_RE = re.compile(r'bedrijf|zakelijk|team|corporate|uitje')
+
 
 # ============================================================================
 # HELPER: Transform English day names to Dutch (backward compatibility)
@@ -53,8 +58,7 @@ def _normalize_opening_hours(opening_hours: Dict[str, Any]) -> Dict[str, Any]:
         return opening_hours
     
     # Check if English (has any English day name)
-    english_keys = list(DAY_NAMES_EN_TO_NL.keys())
-    has_english = any(day.lower() in english_keys for day in opening_hours.keys())
+    has_english = any(day.lower() in DAY_NAMES_EN_TO_NL for day in opening_hours)
     
     if not has_english:
         return opening_hours
@@ -100,8 +104,36 @@ class ContextModule(ABC):
     for the LLM context (e.g., organisation info, FAQs, arrangements).
     
     Apps can subclass this to create custom modules.
+    
+    trigger_signals optionally names the query signals of which at least
+    one must be set for should_include to return True. KnowledgeService
+    uses it to skip the module without calling should_include. None (the
+    default) means should_include is always called.
+    
+    stability orders the modules in the context: 0 = static, 1 = depends
+    on the KB only, 2 = depends on the query (default). Stable modules are
+    rendered first, so consecutive contexts share the longest possible
+    prefix for LLM prompt caching.
+    
+    is_query_independent marks modules whose render output depends on the
+    KB content only (not on search results, signals or kwargs);
+    KnowledgeService renders those once per KB and reuses the output.
     """
     
+    trigger_signals: Optional[FrozenSet[str]] = None
+    stability: int = 2
+    is_query_independent: bool = False
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # A subclass that overrides should_include may include the module on
+        # other signals than its parent; inherited triggers no longer apply
+        if 'should_include' in cls.__dict__ and 'trigger_signals' not in cls.__dict__:
+            cls.trigger_signals = None
+        # Likewise, an overridden render may use the query
+        if 'render' in cls.__dict__ and 'is_query_independent' not in cls.__dict__:
+            cls.is_query_independent = False
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -152,6 +184,9 @@ class ContextModule(ABC):
 class OrganisationModule(ContextModule):
     """Module for organisation description and opening hours."""
     
+    stability = 1
+    trigger_signals = frozenset({'general', 'opening_hours', 'location'})
+    
     @property
     def name(self) -> str:
         return "organisation"
@@ -198,6 +233,10 @@ class OrganisationModule(ContextModule):
 class OpeningHoursModule(ContextModule):
     """Dedicated module for opening hours (when specifically asked)."""
     
+    stability = 1
+    is_query_independent = True
+    trigger_signals = frozenset({'opening_hours'})
+    
     @property
     def name(self) -> str:
         return "opening_hours"
@@ -243,6 +282,10 @@ class OpeningHoursModule(ContextModule):
 class ArrangementsModule(ContextModule):
     """Module for arrangements overview."""
     
+    stability = 1
+    is_query_independent = True
+    trigger_signals = frozenset({'arrangement'})
+    
     def __init__(self, show_all: bool = True, max_items: int = 10):
         """
         Args:
@@ -357,6 +400,9 @@ class ArrangementsModule(ContextModule):
 class FavoriteArrangementsModule(ContextModule):
     """Module for favorite arrangements (non-arrangement queries)."""
     
+    stability = 1
+    is_query_independent = True
+    
     def __init__(self, max_items: int = 5):
         self.max_items = max_items
     
@@ -518,6 +564,8 @@ class SearchResultsModule(ContextModule):
 class KidsModule(ContextModule):
     """Module for kids arrangements/products."""
     
+    trigger_signals = frozenset({'kids'})
+    
     def __init__(self, max_items: int = 5):
         self.max_items = max_items
     
@@ -562,8 +610,7 @@ class KidsModule(ContextModule):
             arrangements = kb_content.get('arrangements', [])
             kids_arrangements = [
                 arr for arr in arrangements
-                if any(word in (arr.get('name', '') + arr.get('category', '')).lower()
-                       for word in ['kids', 'kinder', 'party', 'feest'])
+                if _KIDS_ARRANGEMENT_RE.search((arr.get('name', '') + arr.get('category', '')).lower())
             ]
             
             if kids_arrangements:
@@ -592,6 +639,8 @@ class KidsModule(ContextModule):
 class BedrijfModule(ContextModule):
     """Module for business arrangements/products."""
     
+    trigger_signals = frozenset({'bedrijf'})
+    
     def __init__(self, max_items: int = 5):
         self.max_items = max_items
     
@@ -634,8 +683,7 @@ class BedrijfModule(ContextModule):
             arrangements = kb_content.get('arrangements', [])
             bedrijf_arrangements = [
                 arr for arr in arrangements
-                if any(word in (arr.get('name', '') + arr.get('category', '')).lower()
-                       for word in ['bedrijf', 'zakelijk', 'team', 'corporate', 'uitje'])
+                if _BEDRIJF_ARRANGEMENT_RE.search((arr.get('name', '') + arr.get('category', '')).lower())
             ]
             
             if bedrijf_arrangements:
@@ -663,6 +711,8 @@ class BedrijfModule(ContextModule):
 class ActivityPricingModule(ContextModule):
     """Module for activity-specific pricing."""
     
+    trigger_signals = frozenset({'pricing'})
+    
     def __init__(self):
         pass
     
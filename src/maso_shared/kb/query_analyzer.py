@@ -15,9 +15,14 @@ Usage:
     # Returns: {"kids": True, "pricing": True, "arrangement": True, ...}
 """
 
+import copy
+import heapq
 import logging
 import re
-from typing import List, Dict, Set, Optional, Any, Callable
+import sys
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Set, Optional, Any, Callable, Tuple, FrozenSet, Pattern, Iterable, Mapping
 
 from .types import QuerySignals
 from .constants import (
@@ -42,6 +47,159 @@ DEFAULT_ACTIVITY_SYNONYMS = {
 
 logger = logging.getLogger(__name__)
 
+# Query tokenizer for whole-word keyword matching
+_WORD_RE = re.compile(r'\w+')
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Build a regex for a set of literal keywords with shared prefixes factored out.
+    
+    ['kind', 'kinder', 'kinderfeest'] becomes 'kind(?:er(?:feest)?)?', so the
+    regex engine walks each common prefix once instead of retrying every
+    keyword. Longer continuations are tried first, so the longest keyword
+    at a position wins.
+    """
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def emit(node: Dict[str, Any]) -> str:
+        is_end = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if is_end:
+            return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+        return body
+    
+    return emit(trie)
+
+
+def _compile_substring_scan(keyword_bits: Dict[str, int]) -> Tuple[Pattern, Dict[str, int]]:
+    """
+    Compile substring keywords into one overlapping-match scanner.
+    
+    The lookahead trie pattern reports the longest keyword starting at every
+    position of the query in a single regex pass. Every shorter keyword
+    matching at that same position is a prefix of it, so each keyword's
+    mask also includes the bits of its keyword prefixes.
+    
+    Returns:
+        Tuple of (compiled scanner, keyword -> combined signal bitmask)
+    """
+    masks = {}
+    for keyword in keyword_bits:
+        mask = 0
+        for other, bits in keyword_bits.items():
+            if keyword.startswith(other):
+                mask |= bits
+        masks[keyword] = mask
+    
+    scanner = re.compile('(?=(' + _trie_pattern(keyword_bits) + '))') if keyword_bits else None
+    return scanner, masks
+
+
+def _scan_substrings(scanner: Optional[Pattern], masks: Dict[str, int], text: str) -> int:
+    """Scan text once and return the OR of all matched keyword bitmasks."""
+    mask = 0
+    if scanner is not None:
+        for match in scanner.finditer(text):
+            mask |= masks[match.group(1)]
+    return mask
+
+
+def _compile_signal_keywords(spec) -> Tuple[Dict[str, int], Tuple, Tuple, Tuple]:
+    """
+    Compile a signal keyword spec (see _DEFAULT_SIGNAL_KEYWORDS).
+    
+    Keywords are interned so set/dict lookups against them can take
+    CPython's identity fast path.
+    
+    Returns:
+        Tuple of (signal name -> bit id, ((bit, token set), ...),
+        (substring scanner, keyword masks), ((bit, regex), ...))
+    """
+    signal_ids: Dict[str, int] = {}
+    token_signals = []
+    substring_bits: Dict[str, int] = {}
+    regex_signals = []
+    
+    for name, words, substrings, pattern in spec:
+        name = sys.intern(name)
+        bit = 1 << signal_ids.setdefault(name, len(signal_ids))
+        token_words = set()
+        for word in map(sys.intern, words):
+            # Phrases and non-word keywords ('kan eten', 'ei-vrij') can't be tokens
+            if _WORD_RE.fullmatch(word):
+                token_words.add(word)
+            else:
+                substring_bits[word] = substring_bits.get(word, 0) | bit
+        for keyword in map(sys.intern, substrings):
+            substring_bits[keyword] = substring_bits.get(keyword, 0) | bit
+        if token_words:
+            token_signals.append((bit, frozenset(token_words)))
+        if pattern:
+            regex_signals.append((bit, re.compile(pattern)))
+    
+    return (
+        signal_ids,
+        tuple(token_signals),
+        _compile_substring_scan(substring_bits),
+        tuple(regex_signals),
+    )
+
+
+def _snapshot_keywords(keywords: Mapping[str, Iterable[str]]) -> Dict[str, Iterable[str]]:
+    """
+    Copy of a name -> keywords mapping, keyword lists copied too, so a later
+    comparison with the mapping detects changes made to it in place.
+    """
+    return {name: copy.copy(words) for name, words in keywords.items()}
+
+
+def _compile_activity_scan(
+    activity_synonyms: Mapping[str, Iterable[str]],
+) -> Tuple[Dict[str, Iterable[str]], List[str], Pattern, Dict[str, int]]:
+    """
+    Compile activity synonyms into one scan; bit i marks the i-th activity.
+    
+    The first item is a snapshot of the synonyms the scan was compiled from.
+    """
+    synonym_bits: Dict[str, int] = {}
+    for i, synonyms in enumerate(activity_synonyms.values()):
+        for synonym in synonyms:
+            synonym = sys.intern(synonym.lower())
+            synonym_bits[synonym] = synonym_bits.get(synonym, 0) | (1 << i)
+    return (
+        _snapshot_keywords(activity_synonyms),
+        list(activity_synonyms),
+        *_compile_substring_scan(synonym_bits),
+    )
+
+
+def _compile_pattern_scan(
+    category_patterns: Mapping[str, Iterable[str]],
+) -> Tuple[Dict[str, Iterable[str]], Dict[str, int], Pattern, Dict[str, int]]:
+    """
+    Compile category patterns into one scan; each distinct pattern gets its own bit.
+    
+    The first item is a snapshot of the patterns the scan was compiled from.
+    """
+    pattern_bits: Dict[str, int] = {}
+    for patterns in category_patterns.values():
+        for pattern in patterns:
+            pattern_bits.setdefault(sys.intern(pattern), 1 << len(pattern_bits))
+    return (
+        _snapshot_keywords(category_patterns),
+        pattern_bits,
+        *_compile_substring_scan(pattern_bits),
+    )
+
 
 # ============================================================================
 # DEFAULT CATEGORY DEFINITIONS
@@ -83,6 +241,44 @@ DEFAULT_CATEGORY_PATTERNS = {
 }
 
 
+# ============================================================================
+# DEFAULT SIGNAL KEYWORDS
+# ============================================================================
+
+# (signal, whole-word keywords, substring keywords, extra regex)
+#
+# Whole-word keywords are matched against the query's token set; only short
+# words that otherwise fire inside unrelated words are whole-word ('uur' and
+# 'duur' in 'duurt', 'eten' in 'weten', 'open' in 'openbaar', 'waar' in
+# 'waarom'). All other keywords keep substring semantics for Dutch compounds
+# and inflections ('kinderfeestje', 'notenallergie', 'glutenvrije',
+# 'goedkoopste'), stems ('reserv') and phrases, and are matched in one scan
+# of the query.
+_DEFAULT_SIGNAL_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...], Optional[str]], ...] = (
+    ('general', ('hoi',), ('hallo', 'welkom', 'help', 'wat kun', 'wat kan'), None),
+    ('opening_hours', ('open', 'opent', 'dicht', 'uur'),
+     ('geopend', 'sluit', 'openingstijd', 'maandag', 'dinsdag', 'woensdag', 'donderdag',
+      'vrijdag', 'zaterdag', 'zondag', 'weekend'), None),
+    ('location', ('waar',), ('adres', 'locatie', 'route', 'parkeren', 'navigeer', 'rijden'), None),
+    ('arrangement', (), ('arrangement', 'pakket', 'formule', 'deal', 'feest', 'party', 'uitje'), None),
+    ('kids', (), ('kind', 'kinder', 'kids'), None),
+    ('bedrijf', (), ('bedrijf', 'team', 'corporate', 'zakelijk', 'collega'), None),
+    ('pricing', ('duur',), ('prijs', 'kost', 'euro', '€', 'tarief', 'goedkoop', 'budget'), None),
+    ('reservation', (), ('reserv', 'boek', 'afspraak', 'beschikbaar'), None),
+    ('food', ('eten', 'etentje'), ('maaltijd', 'diner', 'lunch', 'hapje', 'menu', 'gerecht', 'burger', 'pizza'), None),
+    # Drink categories ('bier', 'wijn', ...) also appear in compounds like 'biertje'
+    ('drinks', (), tuple(DRINK_KEYWORDS), None),
+    ('allergy', (), tuple(sorted(ALLERGY_QUERY_KEYWORDS)), None),
+    ('group', (), ('groep', 'grote', 'personen', 'mensen', 'gezelschap'),
+     r'\b\d+\s*(personen|mensen|persoon)\b'),
+)
+
+# Compiled once at import and shared by every analyzer using the defaults
+_DEFAULT_SIGNALS = _compile_signal_keywords(_DEFAULT_SIGNAL_KEYWORDS)
+_DEFAULT_CATEGORY_SCAN = _compile_pattern_scan(DEFAULT_CATEGORY_PATTERNS)
+_DEFAULT_ACTIVITY_SCAN = _compile_activity_scan(DEFAULT_ACTIVITY_SYNONYMS)
+
+
 # ============================================================================
 # QUERY ANALYZER CLASS
 # ============================================================================
@@ -92,7 +288,9 @@ class QueryAnalyzer:
     Analyzes queries to extract signals, categories, and intent.
     
     This is a configurable analyzer that apps can extend with custom
-    categories and signal detectors.
+    categories and signal detectors. category_patterns and activity_synonyms
+    may be replaced or edited in place; their compiled scans are rebuilt on
+    the next call after a change.
     
     Usage:
         analyzer = QueryAnalyzer()
@@ -121,80 +319,52 @@ class QueryAnalyzer:
         self.category_patterns = category_patterns or DEFAULT_CATEGORY_PATTERNS.copy()
         self.activity_synonyms = activity_synonyms or DEFAULT_ACTIVITY_SYNONYMS.copy()
         
+        # Compiled keyword tables are shared with the module-level defaults
+        # unless custom patterns/synonyms were passed in. Both dicts stay
+        # public and mutable; the scans are recompiled when they change.
+        if category_patterns:
+            self._category_scan = _compile_pattern_scan(category_patterns)
+        else:
+            self._category_scan = _DEFAULT_CATEGORY_SCAN
+        if activity_synonyms:
+            self._activity_scan = _compile_activity_scan(activity_synonyms)
+        else:
+            self._activity_scan = _DEFAULT_ACTIVITY_SCAN
+        
+        # Default keyword signals: bit ids, token sets, substring scan, extra regexes
+        signal_ids, self._token_signals, self._substring_scan, self._regex_signals = _DEFAULT_SIGNALS
+        self._signal_ids: Dict[str, int] = dict(signal_ids)
+        
         # Signal detectors - functions that take query and return bool
         self._detectors: Dict[str, Callable[[str], bool]] = {}
-        self._register_default_detectors()
+        
+        # Activity (generic - specific activity detected separately)
+        self.register_detector('activity', lambda q: self._detect_activity(q) is not None)
         
         # Register extra detectors
         if extra_detectors:
             for name, detector in extra_detectors.items():
                 self.register_detector(name, detector)
     
-    def _register_default_detectors(self):
-        """Register the default signal detectors."""
-        
-        # General query
-        self.register_detector('general', lambda q: any(
-            w in q.lower() for w in ['hallo', 'hoi', 'welkom', 'wat kun', 'wat kan', 'help']
-        ))
-        
-        # Opening hours
-        self.register_detector('opening_hours', lambda q: any(
-            w in q.lower() for w in ['open', 'geopend', 'sluit', 'dicht', 'openingstijd', 'uur']
-        ) or any(d in q.lower() for d in ['maandag', 'dinsdag', 'woensdag', 'donderdag', 'vrijdag', 'zaterdag', 'zondag', 'weekend']))
-        
-        # Location
-        self.register_detector('location', lambda q: any(
-            w in q.lower() for w in ['adres', 'waar', 'locatie', 'route', 'parkeren', 'navigeer', 'rijden']
-        ))
-        
-        # Arrangements
-        self.register_detector('arrangement', lambda q: any(
-            w in q.lower() for w in ['arrangement', 'pakket', 'formule', 'deal', 'feest', 'party', 'uitje']
-        ))
-        
-        # Kids
-        self.register_detector('kids', lambda q: any(
-            w in q.lower() for w in ['kind', 'kinder', 'kids', 'kinderen', 'kinderfeest', 'kinderparty']
-        ))
-        
-        # Business
-        self.register_detector('bedrijf', lambda q: any(
-            w in q.lower() for w in ['bedrijf', 'team', 'teamuitje', 'teambuilding', 'corporate', 'zakelijk', 'collega']
-        ))
-        
-        # Pricing
-        self.register_detector('pricing', lambda q: any(
-            w in q.lower() for w in ['prijs', 'kost', 'kosten', 'euro', '€', 'tarief', 'goedkoop', 'duur', 'budget']
-        ))
-        
-        # Reservation
-        self.register_detector('reservation', lambda q: any(
-            w in q.lower() for w in ['reserv', 'boek', 'boeking', 'afspraak', 'beschikbaar']
-        ))
-        
-        # Food
-        self.register_detector('food', lambda q: any(
-            w in q.lower() for w in ['eten', 'maaltijd', 'diner', 'lunch', 'hapje', 'menu', 'gerecht', 'burger', 'pizza']
-        ))
-        
-        # Drinks
-        self.register_detector('drinks', lambda q: any(
-            w in q.lower() for w in DRINK_KEYWORDS
-        ))
-        
-        # Allergies
-        self.register_detector('allergy', lambda q: any(
-            w in q.lower() for w in ALLERGY_QUERY_KEYWORDS
-        ))
-        
-        # Groups
-        self.register_detector('group', lambda q: any(
-            w in q.lower() for w in ['groep', 'grote', 'personen', 'mensen', 'gezelschap']
-        ) or re.search(r'\b\d+\s*(personen|mensen|persoon)\b', q.lower()))
-        
-        # Activity (generic - specific activity detected separately)
-        self.register_detector('activity', lambda q: self._detect_activity(q) is not None)
+    def _current_category_scan(self) -> Tuple[Dict[str, Iterable[str]], Dict[str, int], Pattern, Dict[str, int]]:
+        """Category scan, recompiled if category_patterns changed since it was compiled."""
+        scan = self._category_scan
+        if scan[0] != self.category_patterns:
+            scan = self._category_scan = _compile_pattern_scan(self.category_patterns)
+        return scan
+    
+    def _current_activity_scan(self) -> Tuple[Dict[str, Iterable[str]], List[str], Pattern, Dict[str, int]]:
+        """Activity scan, recompiled if activity_synonyms changed since it was compiled."""
+        scan = self._activity_scan
+        if scan[0] != self.activity_synonyms:
+            scan = self._activity_scan = _compile_activity_scan(self.activity_synonyms)
+        return scan
+    
+    def _signal_id(self, name: str) -> int:
+        """Get the bit id of a signal, assigning the next free one if new."""
+        if name not in self._signal_ids:
+            self._signal_ids[name] = len(self._signal_ids)
+        return self._signal_ids[name]
     
     def _detect_activity(self, query: str) -> Optional[str]:
         """
@@ -202,14 +372,13 @@ class QueryAnalyzer:
         
         Returns the normalized activity name or None.
         """
-        query_lower = query.lower()
-        
-        for activity, synonyms in self.activity_synonyms.items():
-            for synonym in synonyms:
-                if synonym.lower() in query_lower:
-                    return activity
+        _, activity_names, scanner, masks = self._current_activity_scan()
+        mask = _scan_substrings(scanner, masks, query.lower())
+        if not mask:
+            return None
         
-        return None
+        # Lowest set bit = first matching activity in definition order
+        return activity_names[(mask & -mask).bit_length() - 1]
     
     def register_detector(self, name: str, detector: Callable[[str], bool]):
         """
@@ -219,7 +388,10 @@ class QueryAnalyzer:
             name: Signal name
             detector: Function that takes query string and returns bool
         """
+        # Names may be built at runtime; interned like the default signal names
+        name = sys.intern(name)
         self._detectors[name] = detector
+        self._signal_id(name)
     
     def analyze(self, query: str) -> QuerySignals:
         """
@@ -231,15 +403,32 @@ class QueryAnalyzer:
         Returns:
             Dictionary of signal names to boolean values
         """
-        signals: QuerySignals = {}
-        
-        # Run all detectors
+        query_lower = query.lower()
+        tokens = frozenset(_WORD_RE.findall(query_lower))
+        
+        # Accumulate fired signals as a bitmask, materialize the dict once at the end
+        mask = 0
+        for bit, keywords in self._token_signals:
+            if not tokens.isdisjoint(keywords):
+                mask |= bit
+        mask |= _scan_substrings(*self._substring_scan, query_lower)
+        for bit, regex in self._regex_signals:
+            if not mask & bit and regex.search(query_lower):
+                mask |= bit
+        
+        # Run custom detectors (these override keyword signals of the same name)
         for name, detector in self._detectors.items():
+            bit = 1 << self._signal_ids[name]
             try:
-                signals[name] = detector(query)
+                fired = detector(query)
             except Exception as e:
                 logger.warning(f"Detector {name} failed: {e}")
-                signals[name] = False
+                fired = False
+            mask = (mask | bit) if fired else (mask & ~bit)
+        
+        signals: QuerySignals = {
+            name: bool(mask & (1 << i)) for name, i in self._signal_ids.items()
+        }
         
         # Add detected activity name if present
         activity = self._detect_activity(query)
@@ -263,6 +452,10 @@ class QueryAnalyzer:
         query_lower = query.lower()
         query_words = set(query_lower.split())
         
+        # One scan finds every pattern occurring as a substring
+        _, pattern_bits, scanner, masks = self._current_category_scan()
+        found = _scan_substrings(scanner, masks, query_lower)
+        
         category_scores: Dict[str, int] = {}
         
         for category, patterns in self.category_patterns.items():
@@ -273,15 +466,15 @@ class QueryAnalyzer:
                 if pattern in query_words:
                     score += 2
                 # Substring match
-                elif pattern in query_lower:
+                elif found & pattern_bits[pattern]:
                     score += 1
             
             if score > 0:
                 category_scores[category] = score
         
-        # Sort by score and return top categories
-        sorted_cats = sorted(category_scores.items(), key=lambda x: x[1], reverse=True)
-        return [cat for cat, _ in sorted_cats[:max_categories]]
+        # Top categories by score (same order as a stable descending sort)
+        top_cats = heapq.nlargest(max_categories, category_scores.items(), key=itemgetter(1))
+        return [cat for cat, _ in top_cats]
     
     def extract_group_size(self, query: str) -> Optional[int]:
         """
@@ -362,15 +555,10 @@ class QueryAnalyzer:
 # CONVENIENCE FUNCTIONS
 # ============================================================================
 
-_default_analyzer: Optional[QueryAnalyzer] = None
-
-
+@lru_cache(maxsize=None)
 def get_default_analyzer() -> QueryAnalyzer:
-    """Get or create the default query analyzer."""
-    global _default_analyzer
-    if _default_analyzer is None:
-        _default_analyzer = QueryAnalyzer()
-    return _default_analyzer
+    """Get or create the default query analyzer (memoized, thread-safe)."""
+    return QueryAnalyzer()
 
 
 def analyze_query(query: str) -> QuerySignals:
@@ -1,8 +1,11 @@
 """
-Stateless Knowledge Base Search Engine
+Knowledge Base Search Engine
 
 This module provides search functionality for knowledge base content.
-It is completely stateless - all data is passed in as parameters.
+The KB is passed in by the caller (no database access); an engine indexes
+it once and keeps that index for all queries. Indexes are shared between
+engines on the same KB through a small process-wide cache (see
+KBSearchEngine.kb_content and clear_index_cache()).
 
 Used by both Voice AI and Main App for:
 - Searching FAQs, sections, and arrangements
@@ -12,11 +15,19 @@ Used by both Voice AI and Main App for:
 """
 
 import re
+import math
+import heapq
 import logging
-from typing import List, Dict, Any, Set, Optional
+import operator
+import threading
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Set, Optional, Tuple, FrozenSet, Iterable
 from functools import lru_cache
+from dataclasses import dataclass
 
-from .types import KBContent, SearchResult, QuerySignals
+from .types import KBContent, SearchResult, QuerySignals, FAQItem, ContentSection, ArrangementItem
+from .query_analyzer import _compile_substring_scan, _scan_substrings
 from .constants import (
     STOPWORDS,
     SYNONYM_MAP,
@@ -42,16 +53,582 @@ from .constants import (
 
 logger = logging.getLogger(__name__)
 
+# Tokenizer for KB text and queries
+_WORD_RE = re.compile(r'\w+')
+
+# Per-document flags precomputed at index time
+# FAQ flags
+_FAQ_Q_SIM_COUNT = 1 << 0       # question asks how many can race together
+_FAQ_A_SIM_COUNT = 1 << 1       # answer mentions ~20 people
+_FAQ_Q_HEIGHT_OR_AGE = 1 << 2   # question mentions lengte/leeftijd
+_FAQ_A_140_OR_METER = 1 << 3    # answer mentions 140 / meter
+_FAQ_Q_DURATION = 1 << 4        # question is about duration
+_FAQ_Q_MIN_TOPIC = 1 << 5       # question mentions leeftijd/lengte/minimum
+_FAQ_A_MIN_VALUE = 1 << 6       # answer contains a minimum height/age value
+_FAQ_A_NUMBERS = 1 << 7         # answer contains digits
+_FAQ_A_HEIGHT = 1 << 8          # answer contains a height value
+_FAQ_Q_HEIGHT = 1 << 9          # question contains a height indicator
+_FAQ_A_AGE = 1 << 10            # answer contains an age indicator
+_FAQ_Q_AGE = 1 << 11            # question contains an age indicator
+_FAQ_CAT_RACING = 1 << 12       # category is 'simracen'
+
+# Section flags
+_SEC_ARRANGEMENT_PAGE = 1 << 0  # arrangement/deals page
+_SEC_PDF_MENU = 1 << 1          # PDF with menu content
+_SEC_RACING_TITLE = 1 << 2      # 'simracen' in title
+_SEC_DRINK_CONTENT = 1 << 3     # contains drink info
+_SEC_DRINK_TITLE = 1 << 4       # title names a drink/menu
+_SEC_ALLERGY_CONTENT = 1 << 5   # contains allergy/diet info
+_SEC_ALLERGY_TITLE = 1 << 6     # title is about allergies/diets
+
+# Arrangement flags
+_ARR_KIDS = 1 << 0              # kids/party arrangement
+
+# Signal keyword groups for analyze_query_signals, scanned in one pass.
+# 'menu' is internal (menu boost in search()) and not part of QuerySignals.
+_SIGNAL_KEYWORD_GROUPS = (
+    ('kids', KIDS_KEYWORDS),
+    ('bedrijf', BEDRIJF_KEYWORDS),
+    ('pricing', PRICING_KEYWORDS),
+    ('arrangement', ARRANGEMENT_KEYWORDS),
+    ('opening_hours', OPENING_HOURS_KEYWORDS),
+    ('general', GENERAL_KEYWORDS),
+    ('location', LOCATION_KEYWORDS),
+    ('menu', MENU_KEYWORDS),
+)
+_SIGNAL_BITS = {name: 1 << i for i, (name, _) in enumerate(_SIGNAL_KEYWORD_GROUPS)}
+_ALL_SIGNALS = (1 << len(_SIGNAL_KEYWORD_GROUPS)) - 1
+_ARRANGEMENT_SIGNAL = _SIGNAL_BITS['arrangement']
+_MENU_SIGNAL = _SIGNAL_BITS['menu']
+
+# QuerySignals fields in order with their bit ('activity' is never set here)
+_QUERY_SIGNAL_FIELDS = tuple(
+    (name, _SIGNAL_BITS.get(name, 0))
+    for name in ('kids', 'bedrijf', 'pricing', 'activity', 'arrangement',
+                 'general', 'location', 'opening_hours')
+)
+
+
+def _signals_from_mask(mask: int) -> QuerySignals:
+    """QuerySignals dict for a signal bitmask (see _signal_mask)."""
+    return {name: bool(mask & bit) for name, bit in _QUERY_SIGNAL_FIELDS}
+
+
+def _compile_expansions(
+    synonym_items: Iterable[Tuple[str, List[str]]],
+    expansion_items: Iterable[Tuple[str, List[str]]]
+) -> Tuple[Any, Dict[str, int], Tuple[FrozenSet[str], ...], FrozenSet[str]]:
+    """
+    Compile query expansions and synonyms into a trigger index.
+    
+    Every trigger (expansion key, synonym base word or synonym) gets one
+    bit and the words it adds to the query. A single substring scan of the
+    query then yields the triggers present, so expanding costs
+    O(|query| + matches) instead of one substring test per map entry.
+    Triggers keep their substring semantics ('kind' still fires inside
+    'kinderen').
+    
+    Returns:
+        Tuple of (scanner, trigger masks, words added per bit, words always added)
+    """
+    additions: Dict[str, Set[str]] = {}
+    
+    for key, expansions in expansion_items:
+        words = additions.setdefault(key, set())
+        for expansion in expansions:
+            words.update(expansion.split())
+    
+    for base_word, synonym_list in synonym_items:
+        additions.setdefault(base_word, set()).update(synonym_list)
+        for synonym in synonym_list:
+            words = additions.setdefault(synonym, set())
+            words.add(base_word)
+            words.update(s for s in synonym_list if s != synonym)
+    
+    # An empty trigger is contained in every query
+    always = frozenset(additions.pop('', ()))
+    
+    triggers = list(additions)
+    scanner, masks = _compile_substring_scan({trigger: 1 << bit for bit, trigger in enumerate(triggers)})
+    return scanner, masks, tuple(frozenset(additions[trigger]) for trigger in triggers), always
+
+
+def _expand_query(query: str, expander) -> FrozenSet[str]:
+    """Expand a lowercased query into its word set with a trigger index from _compile_expansions."""
+    scanner, masks, additions, always = expander
+    
+    expanded_words = set(query.split())
+    expanded_words.update(always)
+    
+    matched = _scan_substrings(scanner, masks, query)
+    while matched:
+        low = matched & -matched
+        expanded_words.update(additions[low.bit_length() - 1])
+        matched ^= low
+    
+    return frozenset(expanded_words)
+
+
+def _token_mask(tokens: Iterable[str]) -> int:
+    """
+    64-bit Bloom mask of a set of tokens.
+    
+    Two token sets can only share a token if their masks share a bit, so
+    a zero AND rejects a document without any set lookups. str hashes are
+    stable within a process, which is all the masks need.
+    """
+    mask = 0
+    for token in tokens:
+        mask |= 1 << (hash(token) & 63)
+    return mask
+
+
+def _build_arena(texts: List[str]) -> Tuple[str, List[int]]:
+    """
+    Join texts into one arena string, returning it with each text's start offset.
+    
+    Texts are separated by NUL, which never occurs in a search term, so a
+    match never spans two texts.
+    """
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    return '\0'.join(texts), starts
+
+
+def _arena_find(arena: str, starts: List[int], term: str) -> Set[int]:
+    """Positions of the arena texts containing term (one str.find per hit text)."""
+    found = set()
+    if not starts:
+        return found
+    pos = arena.find(term)
+    while pos >= 0:
+        doc = bisect_right(starts, pos) - 1
+        found.add(doc)
+        if doc + 1 >= len(starts):
+            break
+        # Continue from the next text, one hit per text is enough
+        pos = arena.find(term, starts[doc + 1])
+    return found
+
+
+# IMPORTANT_SEARCH_TERMS as bits (sorted, so bits are stable between runs)
+_IMPORTANT_TERM_BITS = {term: 1 << bit for bit, term in enumerate(sorted(IMPORTANT_SEARCH_TERMS))}
+_IMPORTANT_TERM_SCAN = _compile_substring_scan(_IMPORTANT_TERM_BITS)
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(n: int) -> int:
+        return bin(n).count('1')
+
+
+_DEFAULT_EXPANDER = _compile_expansions(SYNONYM_MAP.items(), QUERY_EXPANSIONS.items())
+
+
+@lru_cache(maxsize=2048)
+def _expand_query_default(query: str) -> FrozenSet[str]:
+    """_expand_query with the default SYNONYM_MAP and QUERY_EXPANSIONS (memoized)."""
+    return _expand_query(query, _DEFAULT_EXPANDER)
+
+# Content keyword groups as single alternations (one scan per document)
+_DRINK_CONTENT_RE = re.compile('|'.join(map(re.escape, DRINK_CONTENT_PATTERNS)))
+_ALLERGY_CONTENT_RE = re.compile('|'.join(map(re.escape, ALLERGY_CONTENT_KEYWORDS)))
+
+_HEIGHT_INDICATORS = ('lengte', 'lang', 'groot', 'meter', 'cm', '140', '1,40', 'height')
+_AGE_INDICATORS = ('leeftijd', 'jaar', 'oud', 'jong', 'age')
+_HEIGHT_INDICATOR_RE = re.compile('|'.join(map(re.escape, _HEIGHT_INDICATORS)))
+_AGE_INDICATOR_RE = re.compile('|'.join(map(re.escape, _AGE_INDICATORS)))
+
+# Answer/question characteristics (used at index time)
+_HEIGHT_ANSWER_RE = re.compile(r'140|1[,.]40|meter')
+_DIGIT_RE = re.compile(r'\d')
+
+# Query flags for FAQ scoring (depend only on the query, computed once per search)
+_QF_HEIGHT = 1 << 0
+_QF_RACING = 1 << 1
+_QF_DURATION = 1 << 2
+_QF_AGE = 1 << 3
+_QF_MINIMUM = 1 << 4
+_QF_SIM_COUNT = 1 << 5
+_QF_HOE_LANG = 1 << 6
+_QF_HOEVEEL = 1 << 7
+_QF_HEIGHT_IND = 1 << 8
+_QF_AGE_IND = 1 << 9
+_QF_KIDS_PARTY = 1 << 10   # kids arrangement boost
+_QF_FAQ_RULES = _QF_KIDS_PARTY - 1  # flags used by _faq_rule_score
+
+# Query characteristic keywords (substring semantics)
+_QUERY_FLAG_KEYWORDS = (
+    (_QF_HEIGHT, ('lang', 'groot', 'lengte', 'meter', 'cm')),
+    (_QF_RACING, ('simracen', 'racen', 'race', 'simrace', 'racer')),
+    (_QF_DURATION, ('duurt', 'duren', 'tijd')),
+    (_QF_AGE, ('leeftijd', 'jaar', 'oud', 'minimumleeftijd')),
+    (_QF_MINIMUM, ('minimum', 'minimaal', 'minimale', 'min')),
+    (_QF_SIM_COUNT, ('hoeveel simulator', 'aantal simulator', 'hoeveel race',
+                     'hoeveel personen racen', 'hoeveel kunnen racen')),
+    (_QF_HOE_LANG, ('hoe lang',)),
+    (_QF_HOEVEEL, ('hoeveel', 'aantal', 'hoe veel')),
+    (_QF_HEIGHT_IND, _HEIGHT_INDICATORS),
+    (_QF_AGE_IND, _AGE_INDICATORS),
+    (_QF_KIDS_PARTY, ('kinderfeest', 'kinderparty', 'kids', 'kinder', 'verjaardag', 'birthday')),
+)
+
+def _faq_rule(delta: float, query: int, faq: int, query_not: int = 0, faq_not: int = 0) -> tuple:
+    """
+    One FAQ scoring rule: delta applies when the query has all `query` flags
+    and none of `query_not`, and the FAQ has all `faq` flags and none of
+    `faq_not`. Stored as (query mask, query value, faq mask, faq value, delta).
+    """
+    return (query | query_not, query, faq | faq_not, faq, delta)
+
+
+# Query-type FAQ rules, applied in order. "Any of" conditions are split into
+# rules with exclusions so no FAQ is counted twice.
+_FAQ_RULES = (
+    # Simulator count questions
+    _faq_rule(40, _QF_SIM_COUNT, _FAQ_Q_SIM_COUNT),
+    _faq_rule(35, _QF_SIM_COUNT, _FAQ_A_SIM_COUNT),
+    
+    # "Hoe lang" + racing is about height, not duration
+    _faq_rule(30, _QF_HOE_LANG | _QF_RACING, _FAQ_Q_HEIGHT_OR_AGE),
+    _faq_rule(30, _QF_HOE_LANG | _QF_RACING, _FAQ_A_140_OR_METER, faq_not=_FAQ_Q_HEIGHT_OR_AGE),
+    _faq_rule(-15, _QF_HOE_LANG | _QF_RACING, _FAQ_Q_DURATION,
+              faq_not=_FAQ_Q_HEIGHT_OR_AGE | _FAQ_A_140_OR_METER),
+    
+    # Minimum age/height for racing
+    _faq_rule(35, _QF_MINIMUM | _QF_RACING | _QF_AGE, _FAQ_Q_MIN_TOPIC),
+    _faq_rule(35, _QF_MINIMUM | _QF_RACING | _QF_HEIGHT, _FAQ_Q_MIN_TOPIC, query_not=_QF_AGE),
+    _faq_rule(30, _QF_MINIMUM | _QF_RACING | _QF_AGE, _FAQ_A_MIN_VALUE),
+    _faq_rule(30, _QF_MINIMUM | _QF_RACING | _QF_HEIGHT, _FAQ_A_MIN_VALUE, query_not=_QF_AGE),
+    
+    # Duration questions outside racing
+    _faq_rule(25, _QF_DURATION, _FAQ_Q_DURATION, query_not=_QF_RACING),
+    
+    # Category relevance
+    _faq_rule(20, _QF_RACING, _FAQ_CAT_RACING),
+    _faq_rule(-10, _QF_RACING, 0, faq_not=_FAQ_CAT_RACING),
+    
+    # Numeric queries
+    _faq_rule(15, _QF_HOEVEEL, _FAQ_A_NUMBERS),
+    
+    # Height/age indicator matching
+    _faq_rule(25, _QF_HEIGHT_IND, _FAQ_A_HEIGHT),
+    _faq_rule(15, _QF_HEIGHT_IND, _FAQ_Q_HEIGHT),
+    _faq_rule(20, _QF_AGE_IND, _FAQ_A_AGE),
+    _faq_rule(15, _QF_AGE_IND, _FAQ_Q_AGE),
+)
+
+
+@lru_cache(maxsize=1024)
+def _faq_rules_for_query(query_flags: int) -> Tuple[Tuple[int, int, float], ...]:
+    """
+    _FAQ_RULES partially evaluated for one set of query flags.
+    
+    The query side of every rule is decided once, leaving only the
+    (faq mask, faq value, delta) of the rules that can still fire -
+    usually a handful - to test per FAQ flag combination.
+    """
+    return tuple(
+        (faq_mask, faq_value, delta)
+        for query_mask, query_value, faq_mask, faq_value, delta in _FAQ_RULES
+        if query_flags & query_mask == query_value
+    )
+
+
+@lru_cache(maxsize=4096)
+def _faq_rule_score(query_flags: int, faq_flags: int) -> float:
+    """
+    Query-type score of a FAQ: the sum of the _FAQ_RULES deltas matching the
+    query flags and the FAQ's index-time flags.
+    
+    A KB has few distinct FAQ flag combinations, so per query this is
+    evaluated once per combination (see _search).
+    """
+    score = 0.0
+    for faq_mask, faq_value, delta in _faq_rules_for_query(query_flags):
+        if faq_flags & faq_mask == faq_value:
+            score += delta
+    return score
+
+
+# Query flags are stored above the signal bits in the combined query mask
+_QF_SHIFT = len(_SIGNAL_KEYWORD_GROUPS)
+
+
+def _build_query_scan():
+    """One substring scan for all signal groups and query characteristics."""
+    keyword_bits: Dict[str, int] = {}
+    for name, keywords in _SIGNAL_KEYWORD_GROUPS:
+        for keyword in keywords:
+            keyword_bits[keyword] = keyword_bits.get(keyword, 0) | _SIGNAL_BITS[name]
+    for flag, keywords in _QUERY_FLAG_KEYWORDS:
+        for keyword in keywords:
+            keyword_bits[keyword] = keyword_bits.get(keyword, 0) | flag << _QF_SHIFT
+    return _compile_substring_scan(keyword_bits)
+
+
+_QUERY_SCAN = _build_query_scan()
+
+
+@lru_cache(maxsize=2048)
+def _query_mask(query_lower: str) -> int:
+    """Signal bits and shifted _QF_* flags of the (lowercased) query, in one scan."""
+    return _scan_substrings(*_QUERY_SCAN, query_lower)
+
+
+def _signal_mask(query_lower: str) -> int:
+    """Bitmask of _SIGNAL_KEYWORD_GROUPS matched in the (lowercased) query."""
+    return _query_mask(query_lower) & _ALL_SIGNALS
+
+
+def _faq_query_flags(query_lower: str) -> int:
+    """Bitmask of _QF_* query characteristics for the (lowercased) query."""
+    return _query_mask(query_lower) >> _QF_SHIFT
+
+# BM25+ parameters for word matching (Lv & Zhai, 2011)
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+_BM25_DELTA = 1.0
+
+# Scale of BM25+ term scores relative to the heuristic boosts below
+_FAQ_BM25_WEIGHT = 10.0
+_SECTION_BM25_WEIGHT = 5.0
+
+
+def _bm25_postings(
+    documents: List[Counter],
+    weight: float = 1.0,
+    stopwords: Set[str] = frozenset()
+) -> Dict[str, tuple]:
+    """
+    Build BM25+ postings: term -> ((document position, term score), ...).
+    
+    A term's score in a document only depends on the corpus (tf, document
+    length, idf), so the full BM25+ formula is evaluated here and a query
+    only has to sum the postings of its terms. Stopwords and terms of two
+    characters or less never score and get no postings.
+    
+    Args:
+        documents: Term counts per document
+        weight: Multiplier applied to every term score
+        stopwords: Terms to leave out of the postings
+    """
+    n = len(documents)
+    lengths = [sum(counts.values()) for counts in documents]
+    avgdl = (sum(lengths) / n if n else 0.0) or 1.0
+    
+    df: Counter = Counter()
+    for counts in documents:
+        df.update(counts.keys())
+    
+    postings: Dict[str, List[tuple]] = {}
+    for position, (counts, length) in enumerate(zip(documents, lengths)):
+        norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * length / avgdl)
+        for term, tf in counts.items():
+            if len(term) <= 2 or term in stopwords:
+                continue
+            # Non-negative idf variant, so very common terms never penalize
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            term_score = idf * (tf * (_BM25_K1 + 1) / (tf + norm) + _BM25_DELTA)
+            postings.setdefault(term, []).append((position, weight * term_score))
+    return {term: tuple(entries) for term, entries in postings.items()}
+
+
+_SENTENCE_BOUNDARIES = '.!?\n'
+_SENTENCE_BOUNDARY_RE = re.compile(r'[.!?\n]')
+
+
+@lru_cache(maxsize=2048)
+def _excerpt_terms(query_lower: str) -> Tuple[str, ...]:
+    """
+    Excerpt search terms for a (lowercased) query, best match first.
+    
+    Query words plus Dutch diminutive stems and EXCERPT_SYNONYMS, without
+    stopwords. Equal scores keep query order.
+    """
+    # Build expanded search terms with stems and synonyms (EXCLUDING stopwords)
+    search_terms = []
+    for word in query_lower.split():
+        if len(word) > 2 and word not in STOPWORDS_EXTENDED:
+            search_terms.append(word)
+            # Add Dutch word stems (remove common diminutive suffixes)
+            if word.endswith('tje'):
+                search_terms.append(word[:-3])  # biertje -> bier
+            elif word.endswith('je'):
+                search_terms.append(word[:-2])  # wijntje -> wijn
+            elif word.endswith('tjes'):
+                search_terms.append(word[:-4])  # biertjes -> bier
+            elif word.endswith('jes'):
+                search_terms.append(word[:-3])  # wijntjes -> wijn
+    
+    # Add synonyms for common drink/food terms
+    expanded_terms = list(search_terms)
+    for term in search_terms:
+        if term in EXCERPT_SYNONYMS:
+            expanded_terms.extend(EXCERPT_SYNONYMS[term])
+    
+    # Remove duplicates while preserving order
+    seen = set()
+    unique_terms = []
+    for t in expanded_terms:
+        if t not in seen:
+            seen.add(t)
+            unique_terms.append(t)
+    
+    # Rank terms by match score (stable, so equal scores keep query order)
+    term_scores = {}
+    for word in unique_terms:
+        if word:
+            # Score based on word importance
+            score = len(word) * 2  # Longer words = better match
+            # Bonus for original query terms (not synonyms)
+            if word in search_terms:
+                score += 5
+            # Extra bonus for longer, more specific terms
+            if len(word) >= 6:
+                score += 3
+            term_scores[word] = score
+    return tuple(sorted(term_scores, key=term_scores.get, reverse=True))
+
+
+_FAQ_KEYWORDS = ('mag', 'kunnen', 'vanaf', 'wanneer', 'hoe', 'wat')
+_ARRANGEMENT_DESC_KEYWORDS = ('arrangement', 'kids', 'party', 'kinderfeest', 'verjaardag', 'deal')
+
+# Document keyword groups for the _FAQ_*/_SEC_*/_ARR_* flags (used at index time)
+_FAQ_Q_SIM_COUNT_RE = re.compile(r'hoeveel personen|tegelijk racen|tegen elkaar racen')
+_FAQ_A_SIM_COUNT_RE = re.compile(r'20 personen|twintig personen|20 mensen')
+_FAQ_Q_MIN_TOPIC_RE = re.compile(r'leeftijd|lengte|minimum')
+_FAQ_A_MIN_VALUE_RE = re.compile(r'140|1,40|meter|6 jaar|6 tot')
+_FAQ_A_AGE_RE = re.compile(r'jaar|oud|jong|leeftijd')
+_SEC_PDF_MENU_RE = re.compile(r'menu|koffie|bier|pizza|cocktail')
+_SEC_DRINK_TITLE_RE = re.compile(r'bier|wijn|cocktail|drank|menu')
+_SEC_ALLERGY_TITLE_RE = re.compile(r'allergie|dieet|vegan|vegetarisch|glutenvrij')
+_ARR_KIDS_RE = re.compile(r'kids|kinder|party')
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Query-dependent search data, computed once per query.
+    
+    Built by KBSearchEngine.plan_query; search_with_plan and
+    extract_relevant_excerpt reuse it instead of re-tokenizing and
+    re-expanding the query for every call. Slotted: scorers read plan
+    fields once per document.
+    """
+    __slots__ = (
+        'query', 'query_lower', 'query_words', 'expanded_query', 'expanded_terms',
+        'terms_mask', 'important_mask', 'signal_mask', 'faq_flags', 'excerpt_terms',
+    )
+    
+    query: str
+    query_lower: str
+    query_words: FrozenSet[str]
+    expanded_query: str              # expanded words joined, for substring matching
+    expanded_terms: Tuple[str, ...]  # expanded query words without stopwords
+    terms_mask: int                  # _token_mask(expanded_terms)
+    important_mask: int              # _IMPORTANT_TERM_BITS in expanded_query
+    signal_mask: int
+    faq_flags: int
+    excerpt_terms: Tuple[str, ...]
+    
+    @property
+    def signals(self) -> QuerySignals:
+        """QuerySignals of the query, without lowercasing or scanning it again."""
+        return _signals_from_mask(self.signal_mask)
+    
+    @property
+    def is_arrangement_query(self) -> bool:
+        return bool(self.signal_mask & _ARRANGEMENT_SIGNAL)
+    
+    @property
+    def is_menu_query(self) -> bool:
+        return bool(self.signal_mask & _MENU_SIGNAL)
+
+
+# Attributes set by KBSearchEngine._index_kb, shared between engines on the same KB
+_INDEX_ATTRS = (
+    '_faq_docs', '_faq_questions', '_faq_keywords', '_faq_flags', '_faq_flag_groups',
+    '_faq_keyword_index', '_faq_question_arena', '_faq_question_starts',
+    '_faq_question_lengths', '_faq_by_question_length', '_faq_result_bases',
+    '_faq_postings',
+    '_section_docs', '_section_titles', '_section_title_tokens', '_section_title_masks',
+    '_section_flags', '_section_postings', '_section_title_terms', '_section_content_terms',
+    '_section_contents_lower',
+    '_arr_docs', '_arr_names', '_arr_name_tokens', '_arr_name_masks', '_arr_desc_keywords',
+    '_arr_flags', '_arr_postings', '_arr_result_bases',
+)
+
+# Recently built KB indexes: id(kb_content) -> (kb_content, stopwords, fingerprint, index).
+# Entries hold a strong reference to their KB, so up to _INDEX_CACHE_SIZE
+# KBs stay alive until evicted or clear_index_cache() is called.
+_INDEX_CACHE_SIZE = 8
+_index_cache: Dict[int, tuple] = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def _kb_fingerprint(kb_content: KBContent) -> tuple:
+    """
+    Content hash of the KB document lists.
+    
+    Hashing the lists' repr is a single C-level pass (a few percent of the
+    indexing cost), and catches lists that were replaced, appended to or
+    whose items were edited in place.
+    """
+    return tuple(
+        hash(repr(kb_content.get(key)))
+        for key in ('faqs', 'content_sections', 'arrangements')
+    )
+
+
+def clear_index_cache():
+    """Forget all cached KB indexes (see KBSearchEngine.kb_content)."""
+    with _index_cache_lock:
+        _index_cache.clear()
+
+
+def _indexed_lowercase(text: str) -> str:
+    """
+    text.lower(), taken from a cached KB index if text is a section content.
+    
+    Excerpts are cut from the same section contents query after query,
+    mostly through the KB-less engine of extract_relevant_excerpt; a hit
+    costs a dict lookup per cached KB instead of lowercasing (and
+    allocating) the whole content again. Other texts are not kept.
+    """
+    with _index_cache_lock:
+        indexes = [entry[3] for entry in _index_cache.values()]
+    for index in indexes:
+        lowered = index['_section_contents_lower'].get(text)
+        if lowered is not None:
+            return lowered
+    return text.lower()
+
 
 class KBSearchEngine:
     """
-    Stateless search engine for knowledge base content.
+    Search engine for knowledge base content.
     
-    All data is passed in as parameters - no internal state or database calls.
+    The engine makes no database calls; the KB is passed in by the caller.
+    Assigning kb_content (also done by __init__) indexes it once: token
+    counts, flags and postings per document. FAQ and arrangement result
+    fields are formatted lazily on first use and then reused.
+    
+    Indexes are cached per KB dict in a process-wide LRU (8 KBs), so
+    engines created for the same KB share one index. The cache holds a
+    reference to each KB and checks a content hash of its document lists,
+    so replaced, appended or edited documents are re-indexed the next time
+    an engine is created or kb_content is reassigned. An engine does not
+    notice in-place edits by itself: reassign engine.kb_content after
+    editing. Call clear_index_cache() to release cached KBs, e.g. in tests
+    or after unloading a tenant.
     
     Usage:
-        engine = KBSearchEngine()
-        results = engine.search(kb_content, "welke arrangementen hebben jullie?")
+        engine = KBSearchEngine(kb_content)
+        results = engine.search("welke arrangementen hebben jullie?")
         signals = engine.analyze_query_signals("kinderfeestje prijzen")
     """
     
@@ -70,10 +647,225 @@ class KBSearchEngine:
             synonyms: Custom synonym map (defaults to SYNONYM_MAP)
             query_expansions: Custom query expansions (defaults to QUERY_EXPANSIONS)
         """
-        self.kb_content = kb_content or {}
         self.stopwords = stopwords or STOPWORDS
         self.synonyms = synonyms or SYNONYM_MAP
         self.query_expansions = query_expansions or QUERY_EXPANSIONS
+        self._expander_maps = None
+        self.kb_content = kb_content or {}
+    
+    @property
+    def kb_content(self) -> KBContent:
+        """
+        The knowledge base content being searched.
+        
+        The KB is indexed when assigned. To pick up edits made to it in
+        place afterwards, assign it again (engine.kb_content = kb): an
+        unchanged KB reuses its cached index, a changed one is re-indexed.
+        """
+        return self._kb_content
+    
+    @kb_content.setter
+    def kb_content(self, kb_content: KBContent):
+        self._kb_content = kb_content
+        if not kb_content:
+            self._index_kb()
+            return
+        
+        # Engines on the same KB (one per service/tenant, KB updates with an
+        # unchanged dict) share one index instead of re-indexing it
+        key = id(kb_content)
+        fingerprint = _kb_fingerprint(kb_content)
+        with _index_cache_lock:
+            cached = _index_cache.get(key)
+            if (cached is not None and cached[0] is kb_content
+                    and cached[1] is self.stopwords and cached[2] == fingerprint):
+                _index_cache.move_to_end(key)
+                index = cached[3]
+            else:
+                index = None
+        if index is not None:
+            for name, value in index.items():
+                setattr(self, name, value)
+            return
+        
+        # Built outside the lock; concurrent builds of one KB are equivalent
+        self._index_kb()
+        index = {name: getattr(self, name) for name in _INDEX_ATTRS}
+        with _index_cache_lock:
+            _index_cache[key] = (kb_content, self.stopwords, fingerprint, index)
+            _index_cache.move_to_end(key)
+            while len(_index_cache) > _INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+    
+    def _index_kb(self):
+        """
+        Precompute per-document search data for the current KB content.
+        
+        Lowercased fields, token sets/counts and boolean keyword flags only
+        depend on the KB, so they are computed once here instead of on
+        every query. Fields are stored as parallel lists per document kind
+        (structure of arrays); scorers take a document position.
+        """
+        kb_content = self._kb_content or {}
+        
+        self._faq_docs: List[FAQItem] = []
+        self._faq_questions: List[str] = []
+        self._faq_keywords: List[FrozenSet[str]] = []
+        self._faq_flags: List[int] = []
+        faq_counts: List[Counter] = []
+        for faq in kb_content.get('faqs', []):
+            question = faq.get('question', '').lower()
+            answer = faq.get('answer', '').lower()
+            
+            flags = 0
+            if _FAQ_Q_SIM_COUNT_RE.search(question):
+                flags |= _FAQ_Q_SIM_COUNT
+            if _FAQ_A_SIM_COUNT_RE.search(answer):
+                flags |= _FAQ_A_SIM_COUNT
+            if 'lengte' in question or 'leeftijd' in question:
+                flags |= _FAQ_Q_HEIGHT_OR_AGE
+            if '140' in answer or 'meter' in answer:
+                flags |= _FAQ_A_140_OR_METER
+            if 'duur' in question:
+                flags |= _FAQ_Q_DURATION
+            if _FAQ_Q_MIN_TOPIC_RE.search(question):
+                flags |= _FAQ_Q_MIN_TOPIC
+            if _FAQ_A_MIN_VALUE_RE.search(answer):
+                flags |= _FAQ_A_MIN_VALUE
+            if _DIGIT_RE.search(answer):
+                flags |= _FAQ_A_NUMBERS
+            if _HEIGHT_ANSWER_RE.search(answer):
+                flags |= _FAQ_A_HEIGHT
+            if _HEIGHT_INDICATOR_RE.search(question):
+                flags |= _FAQ_Q_HEIGHT
+            if _FAQ_A_AGE_RE.search(answer):
+                flags |= _FAQ_A_AGE
+            if _AGE_INDICATOR_RE.search(question):
+                flags |= _FAQ_Q_AGE
+            if faq.get('category', '') == 'simracen':
+                flags |= _FAQ_CAT_RACING
+            
+            # Question terms count double, the question is what users ask
+            counts = Counter(_WORD_RE.findall(question))
+            for term in counts:
+                counts[term] *= 2
+            counts.update(_WORD_RE.findall(answer))
+            faq_counts.append(counts)
+            
+            self._faq_docs.append(faq)
+            self._faq_questions.append(question)
+            self._faq_keywords.append(frozenset(k for k in _FAQ_KEYWORDS if k in question))
+            self._faq_flags.append(flags)
+        
+        # Candidate lookups for _faq_candidates: FAQs per flag combination and
+        # per FAQ keyword, questions in an arena and ordered by length
+        flag_groups: Dict[int, List[int]] = {}
+        keyword_index: Dict[str, List[int]] = {}
+        for i, (flags, keywords) in enumerate(zip(self._faq_flags, self._faq_keywords)):
+            flag_groups.setdefault(flags, []).append(i)
+            for keyword in keywords:
+                keyword_index.setdefault(keyword, []).append(i)
+        self._faq_flag_groups = {flags: tuple(group) for flags, group in flag_groups.items()}
+        self._faq_keyword_index = {keyword: tuple(group) for keyword, group in keyword_index.items()}
+        self._faq_question_arena, self._faq_question_starts = _build_arena(self._faq_questions)
+        self._faq_by_question_length = sorted(
+            range(len(self._faq_questions)), key=lambda i: len(self._faq_questions[i])
+        )
+        self._faq_question_lengths = [len(self._faq_questions[i]) for i in self._faq_by_question_length]
+        # Score-independent SearchResult fields, filled in lazily (see _faq_result)
+        self._faq_result_bases: List[Optional[Dict[str, Any]]] = [None] * len(self._faq_docs)
+        self._faq_postings = _bm25_postings(faq_counts, _FAQ_BM25_WEIGHT, self.stopwords)
+        
+        self._section_docs: List[ContentSection] = []
+        self._section_titles: List[str] = []
+        self._section_title_tokens: List[FrozenSet[str]] = []
+        self._section_title_masks: List[int] = []
+        self._section_flags: List[int] = []
+        section_counts: List[Counter] = []
+        section_contents: List[str] = []
+        # Original content -> lowercased, for extract_relevant_excerpt
+        self._section_contents_lower: Dict[str, str] = {}
+        for section in kb_content.get('content_sections', []):
+            content = section.get('content', '').lower()
+            self._section_contents_lower[section.get('content', '')] = content
+            title = section.get('title', '').lower()
+            url = section.get('url', '').lower()
+            
+            flags = 0
+            if 'arrangementen' in title or 'deals' in title or 'arrangement' in url:
+                flags |= _SEC_ARRANGEMENT_PAGE
+            if 'pdf:' in title and _SEC_PDF_MENU_RE.search(content):
+                flags |= _SEC_PDF_MENU
+            if 'simracen' in title:
+                flags |= _SEC_RACING_TITLE
+            if _DRINK_CONTENT_RE.search(content) or _DRINK_CONTENT_RE.search(title):
+                flags |= _SEC_DRINK_CONTENT
+            if _SEC_DRINK_TITLE_RE.search(title):
+                flags |= _SEC_DRINK_TITLE
+            if _ALLERGY_CONTENT_RE.search(content):
+                flags |= _SEC_ALLERGY_CONTENT
+            if _SEC_ALLERGY_TITLE_RE.search(title):
+                flags |= _SEC_ALLERGY_TITLE
+            
+            self._section_docs.append(section)
+            self._section_titles.append(title)
+            section_contents.append(content)
+            title_tokens = frozenset(_WORD_RE.findall(title))
+            self._section_title_tokens.append(title_tokens)
+            self._section_title_masks.append(_token_mask(title_tokens))
+            self._section_flags.append(flags)
+            section_counts.append(Counter(_WORD_RE.findall(content)))
+        
+        self._section_postings = _bm25_postings(section_counts, _SECTION_BM25_WEIGHT, self.stopwords)
+        # IMPORTANT_SEARCH_TERMS per section as bitmasks: in the title, or
+        # only in the content. Contents are scanned once per term over an arena.
+        self._section_title_terms = [
+            _scan_substrings(*_IMPORTANT_TERM_SCAN, title) for title in self._section_titles
+        ]
+        content_terms = [0] * len(section_contents)
+        arena, starts = _build_arena(section_contents)
+        for term, bit in _IMPORTANT_TERM_BITS.items():
+            for i in _arena_find(arena, starts, term):
+                content_terms[i] |= bit
+        self._section_content_terms = [
+            content & ~title for content, title in zip(content_terms, self._section_title_terms)
+        ]
+        
+        self._arr_docs: List[ArrangementItem] = []
+        self._arr_names: List[str] = []
+        self._arr_name_tokens: List[FrozenSet[str]] = []
+        self._arr_name_masks: List[int] = []
+        self._arr_desc_keywords: List[FrozenSet[str]] = []
+        self._arr_flags: List[int] = []
+        # term -> ((arrangement position, 3 * term count), ...)
+        arr_postings: Dict[str, List[tuple]] = {}
+        for arr in kb_content.get('arrangements', []):
+            name = arr.get('name', '').lower()
+            desc = arr.get('description', '').lower()
+            category = arr.get('category', '').lower()
+            
+            flags = 0
+            if _ARR_KIDS_RE.search(name + desc + category):
+                flags |= _ARR_KIDS
+            
+            # Term counts of name + description, each field tokenized once
+            name_words = _WORD_RE.findall(name)
+            counts = Counter(name_words)
+            counts.update(_WORD_RE.findall(desc))
+            position = len(self._arr_docs)
+            for term, count in counts.items():
+                if len(term) > 2 and term not in self.stopwords:
+                    arr_postings.setdefault(term, []).append((position, count * 3))
+            
+            self._arr_docs.append(arr)
+            self._arr_names.append(name)
+            name_tokens = frozenset(name_words)
+            self._arr_name_tokens.append(name_tokens)
+            self._arr_name_masks.append(_token_mask(name_tokens))
+            self._arr_desc_keywords.append(frozenset(k for k in _ARRANGEMENT_DESC_KEYWORDS if k in desc))
+            self._arr_flags.append(flags)
+        self._arr_postings = {term: tuple(entries) for term, entries in arr_postings.items()}
+        self._arr_result_bases: List[Optional[Dict[str, Any]]] = [None] * len(self._arr_docs)
     
     def search(
         self,
@@ -96,355 +888,451 @@ class KBSearchEngine:
             logger.warning("⚠️ Empty knowledge base content")
             return []
 
+        return self.search_with_plan(self.plan_query(query), max_results, min_score)
+    
+    def plan_query(self, query: str) -> 'QueryPlan':
+        """
+        Compute all query-dependent search data once.
+        
+        The plan can be passed to search_with_plan and to
+        extract_relevant_excerpt for each of the results.
+        
+        Args:
+            query: User's search query
+        
+        Returns:
+            QueryPlan for the query
+        """
         query_lower = query.lower()
+        expanded_words = self._expand_query(query_lower)
+        expanded_query = ' '.join(expanded_words)
+        stopwords = self.stopwords
+        # Words of multi-word synonyms count separately (and again if also expanded alone)
+        expanded_terms = tuple(w for w in expanded_query.split() if w not in stopwords)
+        return QueryPlan(
+            query=query,
+            query_lower=query_lower,
+            query_words=frozenset(query_lower.split()),
+            expanded_query=expanded_query,
+            expanded_terms=expanded_terms,
+            terms_mask=_token_mask(expanded_terms),
+            important_mask=_scan_substrings(*_IMPORTANT_TERM_SCAN, expanded_query),
+            signal_mask=_signal_mask(query_lower),
+            faq_flags=_faq_query_flags(query_lower),
+            excerpt_terms=_excerpt_terms(query_lower),
+        )
+    
+    def search_with_plan(
+        self,
+        plan: 'QueryPlan',
+        max_results: int = 5,
+        min_score: float = 0.0
+    ) -> List[SearchResult]:
+        """
+        Search knowledge base content with a precomputed QueryPlan.
+        
+        Args:
+            plan: QueryPlan from plan_query
+            max_results: Maximum number of results to return
+            min_score: Minimum score threshold (optional)
+        
+        Returns:
+            List of SearchResult dicts sorted by relevance score
+        """
+        if not self.kb_content:
+            logger.warning("⚠️ Empty knowledge base content")
+            return []
 
-        # Detect query types for boosting
-        signals = self.analyze_query_signals(query_lower)
-
-        is_arrangement_query = signals.get('arrangement', False)
-        is_menu_query = any(keyword in query_lower for keyword in MENU_KEYWORDS)
-
-        if is_arrangement_query:
+        if plan.is_arrangement_query:
             logger.info("🎯 Arrangement query detected - boosting arrangement pages")
-        if is_menu_query:
+        if plan.is_menu_query:
             logger.info("🍕 Menu query detected - boosting menu content")
 
-        results = self._search(
-            self.kb_content,
-            query,
-            max_results,
-            is_arrangement_query,
-            is_menu_query
-        )
-
-        # Filter by min_score if specified
-        if min_score > 0:
-            results = [r for r in results if r.get('score', 0) >= min_score]
-
-        return results
+        return self._search(self.kb_content, plan, max_results, min_score)
+    
+    def search_batch(
+        self,
+        queries: List[str],
+        max_results: int = 5,
+        min_score: float = 0.0
+    ) -> List[List[SearchResult]]:
+        """
+        Search knowledge base content for several queries at once.
+        
+        Voice AI often sends a burst of (near) identical reformulations;
+        identical queries are searched only once. Queries run one after
+        another: scoring is pure Python, so threads would only contend
+        for the GIL.
+        
+        Args:
+            queries: User search queries
+            max_results: Maximum number of results per query
+            min_score: Minimum score threshold (optional)
+        
+        Returns:
+            One result list per query, in the order of queries
+        """
+        results_by_query = {
+            query: self.search(query, max_results, min_score)
+            for query in dict.fromkeys(queries)
+        }
+        # Separate lists per query, so callers can modify them independently
+        return [list(results_by_query[query]) for query in queries]
+    
     def _search(
         self,
         kb_content: KBContent,
-        query: str,
+        plan: 'QueryPlan',
         max_sections: int = 5,
-        is_arrangement_query: bool = False,
-        is_menu_query: bool = False
+        min_score: float = 0.0
     ) -> List[SearchResult]:
         """Internal search implementation with all scoring logic."""
-        query_lower = query.lower()
-        
-        # Expand query with synonyms and expansions
-        expanded_query = self._expand_query(query_lower)
-        
-        # Get content from KB
-        sections = kb_content.get('content_sections', [])
+        # Get content from KB (documents are pre-indexed in _index_kb)
         searchable = kb_content.get('searchable_content', {})
-        arrangements = kb_content.get('arrangements', [])
-        faqs = kb_content.get('faqs', [])
         
-        logger.debug(f"🔍 SEARCH - sections: {len(sections)}, faqs: {len(faqs)}, arrangements: {len(arrangements)}")
+        logger.debug(f"🔍 SEARCH - sections: {len(self._section_docs)}, faqs: {len(self._faq_docs)}, arrangements: {len(self._arr_docs)}")
         
-        scored_sections: List[tuple] = []
-        
-        # Process FAQs
-        for faq in faqs:
-            score = self._score_faq(faq, query_lower, expanded_query)
-            
-            if score > 0:
-                faq_section: SearchResult = {
-                    "type": "faq",
-                    "title": f"FAQ: {faq.get('question', 'Onbekend')}",
-                    "content": f"VRAAG: {faq.get('question', '')}\n\nANTWOORD: {faq.get('answer', '')}",
-                    "question": faq.get('question', ''),
-                    "answer": faq.get('answer', ''),
-                    "url": faq.get('source_url', ''),
-                    "is_faq": True,
-                    "score": score
-                }
-                scored_sections.append((score, faq_section))
+        # Process FAQs: only the candidates that can score (see _faq_candidates),
+        # every other FAQ scores 0
+        query_lower = plan.query_lower
+        query_flags = plan.faq_flags & _QF_FAQ_RULES
+        word_scores = self._word_hits(self._faq_postings, plan.expanded_terms)
+        # No query-type rule can fire without a rule flag (the common case).
+        # Rules are evaluated once per distinct FAQ flag combination.
+        rule_table = {}
+        if query_flags:
+            rule_table = {flags: _faq_rule_score(query_flags, flags) for flags in self._faq_flag_groups}
+        faq_flags = self._faq_flags
+        score_faq = self._score_faq
+        faq_scores = [0.0] * len(self._faq_docs)
+        for i in self._faq_candidates(query_lower, word_scores, rule_table):
+            base_score = word_scores.get(i, 0.0)
+            if rule_table:
+                base_score += rule_table[faq_flags[i]]
+            faq_scores[i] = score_faq(i, query_lower, base_score)
         
         # Process content sections
-        for i, section in enumerate(sections):
-            score = self._score_section(
-                section, 
-                query_lower, 
-                expanded_query, 
-                searchable, 
-                i,
-                is_arrangement_query,
-                is_menu_query
-            )
-            
-            if score > 0:
-                section_copy = dict(section)
-                section_copy['score'] = score
-                section_copy['search_query'] = expanded_query
-                scored_sections.append((score, section_copy))
+        score_section = self._score_section
+        word_scores = self._word_scores(self._section_postings, len(self._section_docs), plan.expanded_terms)
+        self._add_important_term_scores(plan, word_scores)
+        section_scores = [
+            score_section(i, plan, searchable, word_score) for i, word_score in enumerate(word_scores)
+        ]
         
         # Process arrangements
-        for arr in arrangements:
-            score = self._score_arrangement(
-                arr, 
-                query_lower, 
-                expanded_query,
-                is_arrangement_query
-            )
-            
-            if score > 0:
-                # ✅ FIX: Handle multiple price formats (int, float, str, list)
-                price_raw = arr.get('price', [])
-                if isinstance(price_raw, (int, float)):
-                    # Number → format with currency
-                    price_str = f"€{price_raw:.2f}".replace('.', ',')
-                elif isinstance(price_raw, str):
-                    # String → use directly
-                    price_str = price_raw
-                elif isinstance(price_raw, list) and price_raw:
-                    # List → join elements
-                    price_str = ', '.join(str(p) for p in price_raw)
-                else:
-                    # Empty or None → fallback
-                    price_str = "Prijs op aanvraag"
-                
-                arr_section: SearchResult = {
-                    "type": "arrangement",
-                    "title": f"Arrangement: {arr.get('name', 'Onbekend')}",
-                    "content": f"{arr.get('name', '')} - {arr.get('description', '')} - Prijs: {price_str} - Duur: {arr.get('duration', '')}",
-                    "url": arr.get('source_url', ''),
-                    "metadata": {
-                        "prices": arr.get('price', []),
-                        "duration": arr.get('duration', ''),
-                        "activities": arr.get('activities', [])
-                    },
-                    "is_arrangement": True,
-                    "score": score
-                }
-                scored_sections.append((score, arr_section))
-        
-        # Sort by score and return top sections
-        scored_sections.sort(reverse=True, key=lambda x: x[0])
-        return [section for score, section in scored_sections[:max_sections]]
+        score_arrangement = self._score_arrangement
+        word_scores = self._word_scores(self._arr_postings, len(self._arr_docs), plan.expanded_terms)
+        arr_scores = [score_arrangement(i, plan, word_score) for i, word_score in enumerate(word_scores)]
+        
+        # One flat score array (FAQs, sections, arrangements); candidates are
+        # plain indices into it, no (score, kind, position) tuple per document
+        scores = faq_scores + section_scores + arr_scores
+        if min_score > 0:
+            candidates = [j for j, score in enumerate(scores) if score > 0 and score >= min_score]
+        else:
+            candidates = [j for j, score in enumerate(scores) if score > 0]
+        
+        # Partial heap selection of the top sections (stable for equal scores)
+        top = heapq.nlargest(max_sections, candidates, key=scores.__getitem__)
+        
+        # SearchResults are only built for the top results
+        section_start = len(faq_scores)
+        arr_start = section_start + len(section_scores)
+        results: List[SearchResult] = []
+        for j in top:
+            if j < section_start:
+                results.append(self._faq_result(j, scores[j]))
+            elif j < arr_start:
+                results.append(self._section_result(j - section_start, scores[j], plan))
+            else:
+                results.append(self._arrangement_result(j - arr_start, scores[j]))
+        return results
+    
+    def _faq_result(self, i: int, score: float) -> SearchResult:
+        """Build the SearchResult for the FAQ at position i."""
+        base = self._faq_result_bases[i]
+        if base is None:
+            # Score-independent fields, formatted the first time the FAQ is returned
+            faq = self._faq_docs[i]
+            base = self._faq_result_bases[i] = {
+                "type": "faq",
+                "title": f"FAQ: {faq.get('question', 'Onbekend')}",
+                "content": f"VRAAG: {faq.get('question', '')}\n\nANTWOORD: {faq.get('answer', '')}",
+                "question": faq.get('question', ''),
+                "answer": faq.get('answer', ''),
+                "url": faq.get('source_url', ''),
+                "is_faq": True,
+            }
+        faq_section: SearchResult = {**base, "score": score}
+        return faq_section
+    
+    def _section_result(self, i: int, score: float, plan: 'QueryPlan') -> SearchResult:
+        """Build the SearchResult (a copy of the section) for the section at position i."""
+        return {**self._section_docs[i], 'score': score, 'search_query': plan.expanded_query}
+    
+    def _arrangement_result(self, i: int, score: float) -> SearchResult:
+        """Build the SearchResult for the arrangement at position i."""
+        base = self._arr_result_bases[i]
+        if base is None:
+            # Score-independent fields, formatted the first time the arrangement is returned
+            base = self._arr_result_bases[i] = self._arrangement_result_base(self._arr_docs[i])
+        arr_section: SearchResult = {**base, "metadata": dict(base["metadata"]), "score": score}
+        return arr_section
+    
+    @staticmethod
+    def _arrangement_result_base(arr: ArrangementItem) -> Dict[str, Any]:
+        """SearchResult fields of an arrangement that do not depend on the query."""
+        # ✅ FIX: Handle multiple price formats (int, float, str, list)
+        price_raw = arr.get('price', [])
+        if isinstance(price_raw, (int, float)):
+            # Number → format with currency
+            price_str = f"€{price_raw:.2f}".replace('.', ',')
+        elif isinstance(price_raw, str):
+            # String → use directly
+            price_str = price_raw
+        elif isinstance(price_raw, list) and price_raw:
+            # List → join elements
+            price_str = ', '.join(str(p) for p in price_raw)
+        else:
+            # Empty or None → fallback
+            price_str = "Prijs op aanvraag"
+        
+        return {
+            "type": "arrangement",
+            "title": f"Arrangement: {arr.get('name', 'Onbekend')}",
+            "content": f"{arr.get('name', '')} - {arr.get('description', '')} - Prijs: {price_str} - Duur: {arr.get('duration', '')}",
+            "url": arr.get('source_url', ''),
+            "metadata": {
+                "prices": arr.get('price', []),
+                "duration": arr.get('duration', ''),
+                "activities": arr.get('activities', [])
+            },
+            "is_arrangement": True,
+        }
+    
+    def _word_scores(
+        self,
+        postings: Dict[str, tuple],
+        size: int,
+        terms: Iterable[str]
+    ) -> List[float]:
+        """
+        Word matching scores for all documents of one kind, summed from
+        the term postings built in _index_kb.
+        
+        Only the documents that contain a query term are touched, instead
+        of testing every query word against every document. Stopwords are
+        already left out of the postings.
+        """
+        scores = [0.0] * size
+        get_postings = postings.get
+        for word in terms:
+            for position, weight in get_postings(word, ()):
+                scores[position] += weight
+        return scores
+    
+    def _word_hits(self, postings: Dict[str, tuple], terms: Iterable[str]) -> Dict[int, float]:
+        """
+        Sparse _word_scores: position -> word score, for the documents that
+        contain a query term only.
+        """
+        scores: Dict[int, float] = {}
+        get_postings = postings.get
+        get_score = scores.get
+        for word in terms:
+            for position, weight in get_postings(word, ()):
+                scores[position] = get_score(position, 0.0) + weight
+        return scores
+    
+    def _faq_candidates(
+        self,
+        query_lower: str,
+        word_scores: Dict[int, float],
+        rule_table: Dict[int, float]
+    ) -> Set[int]:
+        """
+        Positions of the FAQs that can get a non-zero score, from the indexes
+        built in _index_kb instead of a pass over all FAQs.
+        
+        A FAQ scores through a query term (word_scores), a non-zero
+        query-type rule for its flags, a FAQ keyword in the query or an
+        exact match between query and question (see _score_faq).
+        """
+        candidates = set(word_scores)
+        
+        for flags, rule_score in rule_table.items():
+            if rule_score:
+                candidates.update(self._faq_flag_groups[flags])
+        
+        for keyword in _FAQ_KEYWORDS:
+            if keyword in query_lower:
+                candidates.update(self._faq_keyword_index.get(keyword, ()))
+        
+        # Exact match: questions containing the query (one arena scan), or
+        # questions short enough to be contained in it
+        candidates.update(_arena_find(self._faq_question_arena, self._faq_question_starts, query_lower))
+        questions = self._faq_questions
+        for i in self._faq_by_question_length[:bisect_right(self._faq_question_lengths, len(query_lower))]:
+            if questions[i] in query_lower:
+                candidates.add(i)
+        
+        return candidates
     
     def _score_faq(
         self,
-        faq: Dict[str, Any],
+        i: int,
         query_lower: str,
-        expanded_query: str
+        base_score: float = 0.0
     ) -> float:
-        """Score a FAQ item based on query relevance."""
-        score = 0.0
-        question = faq.get('question', '').lower()
-        answer = faq.get('answer', '').lower()
-        category = faq.get('category', '')
-        
-        # Detect query characteristics
-        is_height_query = any(word in query_lower for word in ['lang', 'groot', 'lengte', 'meter', 'cm'])
-        is_racing_query = any(word in query_lower for word in ['simracen', 'racen', 'race', 'simrace', 'racer'])
-        is_duration_query = any(word in query_lower for word in ['duurt', 'duren', 'tijd'])
-        is_age_query = any(word in query_lower for word in ['leeftijd', 'jaar', 'oud', 'minimumleeftijd'])
-        is_minimum_query = any(word in query_lower for word in ['minimum', 'minimaal', 'minimale', 'min'])
-        
-        is_simulator_count_query = any(phrase in query_lower for phrase in [
-            'hoeveel simulator', 'aantal simulator', 'hoeveel race',
-            'hoeveel personen racen', 'hoeveel kunnen racen'
-        ])
-        
-        # Specific query type scoring
-        if is_simulator_count_query:
-            if any(phrase in question for phrase in ['hoeveel personen', 'tegelijk racen', 'tegen elkaar racen']):
-                score += 40
-            if any(phrase in answer for phrase in ['20 personen', 'twintig personen', '20 mensen']):
-                score += 35
-        
-        if 'hoe lang' in query_lower and is_racing_query:
-            if 'lengte' in question or 'leeftijd' in question or '140' in answer or 'meter' in answer:
-                score += 30
-            elif 'duurt' in question or 'duur' in question:
-                score -= 15
-        
-        if is_minimum_query and is_racing_query and (is_age_query or is_height_query):
-            if any(word in question for word in ['leeftijd', 'lengte', 'minimum']):
-                score += 35
-            if any(word in answer for word in ['140', '1,40', 'meter', '6 jaar', '6 tot']):
-                score += 30
-        
-        if is_duration_query and not is_racing_query:
-            if 'duurt' in question or 'duur' in question:
-                score += 25
+        """
+        Score an indexed FAQ item (see _index_kb) based on query relevance.
+        
+        Args:
+            i: FAQ position in the index
+            query_lower: Lowercased query
+            base_score: Precomputed BM25+ word score (see _word_scores) plus
+                the query-type score (see _faq_rule_score)
+        """
+        score = base_score
+        question = self._faq_questions[i]
         
         # Exact match bonus
         if query_lower in question or question in query_lower:
             score += 50
         
-        # Category relevance
-        if is_racing_query and category == 'simracen':
-            score += 20
-        elif is_racing_query and category != 'simracen':
-            score -= 10
-        
-        # Word matching
-        for word in expanded_query.split():
-            if len(word) > 2 and word not in self.stopwords:
-                if word in question:
-                    score += 15
-                if word in answer:
-                    score += 8
-        
-        # Numeric queries
-        if any(word in query_lower for word in ['hoeveel', 'aantal', 'hoe veel']):
-            numbers_in_answer = re.findall(r'\d+', answer)
-            if numbers_in_answer:
-                score += 15
-        
-        # Height/age indicator matching
-        height_indicators = ['lengte', 'lang', 'groot', 'meter', 'cm', '140', '1,40', 'height']
-        age_indicators = ['leeftijd', 'jaar', 'oud', 'jong', 'age']
-        
-        if any(ind in query_lower for ind in height_indicators):
-            if any(ind in answer for ind in ['140', '1,40', '1.40', 'meter']):
-                score += 25
-            if any(ind in question for ind in height_indicators):
-                score += 15
-        
-        if any(ind in query_lower for ind in age_indicators):
-            if any(ind in answer for ind in ['jaar', 'oud', 'jong', 'leeftijd']):
-                score += 20
-            if any(ind in question for ind in age_indicators):
-                score += 15
-        
         # FAQ-style keyword matching
-        faq_keywords = ['mag', 'kunnen', 'vanaf', 'wanneer', 'hoe', 'wat']
-        for keyword in faq_keywords:
-            if keyword in query_lower and keyword in question:
+        for keyword in self._faq_keywords[i]:
+            if keyword in query_lower:
                 score += 5
         
         return score
     
     def _score_section(
         self,
-        section: Dict[str, Any],
-        query_lower: str,
-        expanded_query: str,
+        i: int,
+        plan: 'QueryPlan',
         searchable: Dict[str, List[int]],
-        section_index: int,
-        is_arrangement_query: bool = False,
-        is_menu_query: bool = False
+        word_score: float = 0.0
     ) -> float:
-        """Score a content section based on query relevance."""
-        score = 0.0
-        content = section.get('content', '').lower()
-        title = section.get('title', '').lower()
-        url = section.get('url', '').lower()
+        """
+        Score an indexed content section (see _index_kb) based on query relevance.
+        
+        i is the section position (also its index in searchable_content);
+        word_score is the precomputed BM25+ content score (see _word_scores)
+        plus the important term score (see _add_important_term_scores), the
+        boosts below are added on top of it.
+        """
+        score = word_score
+        title = self._section_titles[i]
+        flags = self._section_flags[i]
+        expanded_query = plan.expanded_query
         
         # Boost arrangement pages for arrangement queries
-        if is_arrangement_query:
-            if 'arrangementen' in title or 'deals' in title or 'arrangement' in url:
-                score += 100
-                logger.debug(f"🎯 Arrangement page boost: '{title}' +100 points")
+        if plan.is_arrangement_query and flags & _SEC_ARRANGEMENT_PAGE:
+            score += 100
+            logger.debug(f"🎯 Arrangement page boost: '{title}' +100 points")
         
         # Boost PDF menus for menu queries
-        is_pdf_menu = 'pdf:' in title and any(word in content for word in ['menu', 'koffie', 'bier', 'pizza', 'cocktail'])
-        if is_menu_query and is_pdf_menu:
+        if plan.is_menu_query and flags & _SEC_PDF_MENU:
             score += 50
             logger.debug(f"🍕 PDF Menu boost: '{title}' +50 points for menu query")
         
         # Racing content boost
-        is_racing_query = any(word in query_lower for word in ['simracen', 'racen', 'race', 'simrace', 'racer'])
-        if is_racing_query and 'simracen' in title:
+        is_racing_query = bool(plan.faq_flags & _QF_RACING)
+        if is_racing_query and flags & _SEC_RACING_TITLE:
             score += 15
         
 
         # DRINK-SPECIFIC BOOST
         # When user asks about drinks (bier, wijn, etc.), boost sections containing drink info
-        query_words = set(query_lower.split())
+        query_words = plan.query_words
         is_drink_query = bool(query_words & ALL_DRINK_KEYWORDS)
-        if is_drink_query:
-            has_drink_content = any(pattern in content or pattern in title for pattern in DRINK_CONTENT_PATTERNS)
-            if has_drink_content:
-                score += 30
-                # Extra boost if title contains drink word
-                if any(drink in title for drink in ['bier', 'wijn', 'cocktail', 'drank', 'menu']):
-                    score += 15
+        if is_drink_query and flags & _SEC_DRINK_CONTENT:
+            score += 30
+            # Extra boost if title contains drink word
+            if flags & _SEC_DRINK_TITLE:
+                score += 15
 
         # ALLERGY/DIET BOOST
         # When user asks about allergies, boost sections with allergy info
         is_allergy_query = bool(query_words & ALLERGY_QUERY_KEYWORDS)
-        if is_allergy_query:
-            has_allergy_content = any(kw in content for kw in ALLERGY_CONTENT_KEYWORDS)
-            if has_allergy_content:
-                score += 35
-                # Extra boost for sections specifically about allergies/diets
-                if any(kw in title for kw in ['allergie', 'dieet', 'vegan', 'vegetarisch', 'glutenvrij']):
-                    score += 20
+        if is_allergy_query and flags & _SEC_ALLERGY_CONTENT:
+            score += 35
+            # Extra boost for sections specifically about allergies/diets
+            if flags & _SEC_ALLERGY_TITLE:
+                score += 20
 
         # Searchable index matching
         for term, section_indices in searchable.items():
-            if term in expanded_query and section_index in section_indices:
+            if term in expanded_query and i in section_indices:
                 score += 10
         
-        # Title word matching
-        if any(word in title for word in expanded_query.split() if word not in self.stopwords):
-            score += 8
-        
-        # Content word matching
-        for word in expanded_query.split():
-            if len(word) > 2 and word not in self.stopwords:
-                score += content.count(word) * 2
-        
-        # Important term matching
-        for term in IMPORTANT_SEARCH_TERMS:
-            if term in expanded_query:
-                if term in title:
-                    score += 12
-                elif term in content:
-                    score += 6
+        # Title word matching (Bloom mask rejects most titles without lookups)
+        if self._section_title_masks[i] & plan.terms_mask:
+            title_tokens = self._section_title_tokens[i]
+            if not title_tokens.isdisjoint(plan.expanded_terms):
+                score += 8
         
         return score
     
+    def _add_important_term_scores(self, plan: 'QueryPlan', scores: List[float]):
+        """
+        Add IMPORTANT_SEARCH_TERMS matches to the section scores in place.
+        
+        A query term scores +12 in a section title, otherwise +6 in its
+        content. Terms are bits (see _IMPORTANT_TERM_BITS), so a section
+        takes two ANDs and popcounts against the bitmasks from _index_kb.
+        """
+        query_terms = plan.important_mask
+        if not query_terms:
+            return
+        for i, (title_terms, content_terms) in enumerate(
+                zip(self._section_title_terms, self._section_content_terms)):
+            if query_terms & (title_terms | content_terms):
+                scores[i] += 12 * _popcount(query_terms & title_terms) + 6 * _popcount(query_terms & content_terms)
+    
     def _score_arrangement(
         self,
-        arr: Dict[str, Any],
-        query_lower: str,
-        expanded_query: str,
-        is_arrangement_query: bool = False
+        i: int,
+        plan: 'QueryPlan',
+        word_score: float = 0.0
     ) -> float:
-        """Score an arrangement based on query relevance."""
-        score = 0.0
-        arr_name = arr.get('name', '').lower()
-        arr_desc = arr.get('description', '').lower()
-        arr_category = arr.get('category', '').lower()
+        """
+        Score an indexed arrangement (see _index_kb) based on query relevance.
+        
+        word_score is the precomputed name/description term frequency
+        score (see _word_scores).
+        """
+        score = word_score
+        arr_name = self._arr_names[i]
+        expanded_terms = plan.expanded_terms
         
         # Huge boost for arrangement queries
-        if is_arrangement_query:
+        if plan.is_arrangement_query:
             score += 80
             logger.debug(f"🎯 Arrangement query boost: '{arr_name}' +80 points")
         
         # Kids arrangement boost
-        if any(word in query_lower for word in ['kinderfeest', 'kinderparty', 'kids', 'kinder', 'verjaardag', 'birthday']):
-            if any(word in arr_name + arr_desc + arr_category for word in ['kids', 'kinder', 'party']):
+        if plan.faq_flags & _QF_KIDS_PARTY:
+            if self._arr_flags[i] & _ARR_KIDS:
                 score += 60
                 logger.debug(f"🎈 Kids arrangement boost: '{arr_name}' +60 points")
         
-        # Name word matching
-        if any(word in arr_name for word in expanded_query.split() if word not in self.stopwords):
-            score += 15
-        
-        # Content word matching
-        for word in expanded_query.split():
-            if len(word) > 2 and word not in self.stopwords:
-                count = (arr_name + arr_desc).count(word)
-                if count > 0:
-                    score += count * 3
+        # Name word matching (Bloom mask rejects most names without lookups)
+        if self._arr_name_masks[i] & plan.terms_mask:
+            name_tokens = self._arr_name_tokens[i]
+            if not name_tokens.isdisjoint(expanded_terms):
+                score += 15
         
         # Arrangement keyword matching
-        arrangement_keywords = ['arrangement', 'kids', 'party', 'kinderfeest', 'verjaardag', 'deal']
-        for keyword in arrangement_keywords:
-            if keyword in expanded_query and keyword in arr_desc:
+        expanded_query = plan.expanded_query
+        for keyword in self._arr_desc_keywords[i]:
+            if keyword in expanded_query:
                 score += 8
         
         return score
     
-    def _expand_query(self, query: str) -> str:
+    def _expand_query(self, query: str) -> FrozenSet[str]:
         """
         Expand query with synonyms and query expansions.
         
@@ -452,25 +1340,29 @@ class KBSearchEngine:
             query: Original query (lowercase)
             
         Returns:
-            Expanded query string with additional terms
+            Query words plus the added expansion and synonym terms
         """
-        expanded_query = query
+        expander_maps = self._expander_maps
+        if (expander_maps is None or expander_maps[0] is not self.synonyms
+                or expander_maps[1] is not self.query_expansions):
+            self._expander = self._build_expander()
+            self._expander_maps = (self.synonyms, self.query_expansions)
+        return self._expander(query)
+    
+    def _build_expander(self):
+        """Memoized expansion function for the current synonym and expansion maps."""
+        # Default configuration: shared module-level cache across engines
+        if self.synonyms is SYNONYM_MAP and self.query_expansions is QUERY_EXPANSIONS:
+            return _expand_query_default
         
-        # Apply query expansions
-        for key, expansions in self.query_expansions.items():
-            if key in query:
-                expanded_query += ' ' + ' '.join(expansions)
+        # Custom maps are compiled once, replace the map (not mutate it) to change them
+        expander = _compile_expansions(self.synonyms.items(), self.query_expansions.items())
         
-        # Expand with synonyms
-        expanded_words = set(expanded_query.split())
-        for base_word, synonyms in self.synonyms.items():
-            if base_word in query:
-                expanded_words.update(synonyms)
-            for synonym in synonyms:
-                if synonym in query:
-                    expanded_words.update([base_word] + [s for s in synonyms if s != synonym])
+        @lru_cache(maxsize=1024)
+        def expand(query: str) -> FrozenSet[str]:
+            return _expand_query(query, expander)
         
-        return ' '.join(expanded_words)
+        return expand
     
     def analyze_query_signals(self, query: str) -> QuerySignals:
         """
@@ -482,48 +1374,16 @@ class KBSearchEngine:
         Returns:
             QuerySignals dict with boolean flags for each signal type
         """
-        query_lower = query.lower()
-        
-        signals: QuerySignals = {
-            'kids': False,
-            'bedrijf': False,
-            'pricing': False,
-            'activity': False,
-            'arrangement': False,
-            'general': False,
-            'location': False,
-            'opening_hours': False,
-        }
-        
-        # Kids signals
-        signals['kids'] = any(keyword in query_lower for keyword in KIDS_KEYWORDS)
-        
-        # Bedrijf signals
-        signals['bedrijf'] = any(keyword in query_lower for keyword in BEDRIJF_KEYWORDS)
-        
-        # Pricing signals
-        signals['pricing'] = any(keyword in query_lower for keyword in PRICING_KEYWORDS)
-        
-        # Arrangement signals
-        signals['arrangement'] = any(keyword in query_lower for keyword in ARRANGEMENT_KEYWORDS)
-        
-        # Opening hours signals
-        signals['opening_hours'] = any(keyword in query_lower for keyword in OPENING_HOURS_KEYWORDS)
-        
-        # General signals
-        signals['general'] = any(keyword in query_lower for keyword in GENERAL_KEYWORDS)
-        
-        # Location signals
-        signals['location'] = any(keyword in query_lower for keyword in LOCATION_KEYWORDS)
-        
-        return signals
+        # All keyword groups are matched in a single (memoized) scan of the query
+        return _signals_from_mask(_signal_mask(query.lower()))
     
     def extract_relevant_excerpt(
         self,
         content: str,
         search_query: str,
         context_chars: int = 1000,
-        before_chars: int = 300
+        before_chars: int = 300,
+        plan: Optional['QueryPlan'] = None
     ) -> str:
         """
         Extract relevant excerpt from content around search terms.
@@ -538,60 +1398,28 @@ class KBSearchEngine:
             search_query: Query to find relevant section
             context_chars: Characters to include after match
             before_chars: Characters to include before match
+            plan: Optional QueryPlan for search_query (see plan_query),
+                reuses its precomputed excerpt terms
 
         Returns:
             Relevant excerpt with ellipsis
         """
-        content_lower = content.lower()
-        query_lower = search_query.lower()
-        
-        # Build expanded search terms with stems and synonyms (EXCLUDING stopwords)
-        search_terms = []
-        for word in query_lower.split():
-            if len(word) > 2 and word not in STOPWORDS_EXTENDED:
-                search_terms.append(word)
-                # Add Dutch word stems (remove common diminutive suffixes)
-                if word.endswith('tje'):
-                    search_terms.append(word[:-3])  # biertje -> bier
-                elif word.endswith('je'):
-                    search_terms.append(word[:-2])  # wijntje -> wijn
-                elif word.endswith('tjes'):
-                    search_terms.append(word[:-4])  # biertjes -> bier
-                elif word.endswith('jes'):
-                    search_terms.append(word[:-3])  # wijntjes -> wijn
-        
-        # Add synonyms for common drink/food terms
-        expanded_terms = list(search_terms)
-        for term in search_terms:
-            if term in EXCERPT_SYNONYMS:
-                expanded_terms.extend(EXCERPT_SYNONYMS[term])
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_terms = []
-        for t in expanded_terms:
-            if t not in seen:
-                seen.add(t)
-                unique_terms.append(t)
-        
-        # Find best match position using expanded terms
+        content_lower = self._section_contents_lower.get(content)
+        if content_lower is None:
+            content_lower = _indexed_lowercase(content)
+        
+        # Search terms ranked by match score (computed once per query)
+        ranked_terms = plan.excerpt_terms if plan is not None else _excerpt_terms(search_query.lower())
+        
+        # Best match: first occurrence of the best ranked term present. Terms
+        # are tried best first, so the search stops at the first term found;
+        # each str.find is a C-level scan, far cheaper than one regex pass
+        # trying every term at every position.
         best_pos = -1
-        best_score = 0
-        
-        for word in unique_terms:
-            pos = content_lower.find(word)
-            if pos >= 0:
-                # Score based on word importance and position
-                score = len(word) * 2  # Longer words = better match
-                # Bonus for original query terms (not synonyms)
-                if word in search_terms:
-                    score += 5
-                # Extra bonus for longer, more specific terms
-                if len(word) >= 6:
-                    score += 3
-                if score > best_score:
-                    best_score = score
-                    best_pos = pos
+        for term in ranked_terms:
+            best_pos = content_lower.find(term)
+            if best_pos >= 0:
+                break
 
         if best_pos < 0:
             return content[:context_chars] + "..."
@@ -600,16 +1428,16 @@ class KBSearchEngine:
         start = max(0, best_pos - before_chars)
         end = min(len(content), best_pos + context_chars)
 
-        # Expand to sentence boundaries
-        while start > 0 and content[start] not in '.!?\n':
-            start -= 1
-            if best_pos - start > before_chars + 100:
-                break
+        # Expand to sentence boundaries, at most 100 chars beyond the window
+        if start > 0:
+            lo = max(0, best_pos - before_chars - 100)
+            boundary = max(content.rfind(ch, lo, start + 1) for ch in _SENTENCE_BOUNDARIES)
+            start = boundary if boundary >= 0 else max(0, lo - 1)
 
-        while end < len(content) and content[end] not in '.!?\n':
-            end += 1
-            if end - best_pos > context_chars + 100:
-                break
+        if end < len(content):
+            hi = best_pos + context_chars + 100
+            match = _SENTENCE_BOUNDARY_RE.search(content, end, hi + 1)
+            end = match.start() if match else min(len(content), hi + 1)
 
         excerpt = content[start:end].strip()
 
@@ -626,16 +1454,10 @@ class KBSearchEngine:
 # CONVENIENCE FUNCTIONS
 # ============================================================================
 
-# Global search engine instance
-_search_engine_instance: Optional[KBSearchEngine] = None
-
-
+@lru_cache(maxsize=None)
 def get_search_engine() -> KBSearchEngine:
-    """Get or create a global search engine instance."""
-    global _search_engine_instance
-    if _search_engine_instance is None:
-        _search_engine_instance = KBSearchEngine()
-    return _search_engine_instance
+    """Get or create a global search engine instance (memoized, thread-safe)."""
+    return KBSearchEngine()
 
 
 def extract_relevant_excerpt(
@@ -25,10 +25,13 @@ Usage:
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Callable
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Hashable, Tuple
 
 from .types import KBContent, SearchResult, QuerySignals
-from .search import KBSearchEngine, extract_relevant_excerpt
+from .search import KBSearchEngine, extract_relevant_excerpt, _build_arena
 from .query_analyzer import QueryAnalyzer, analyze_query
 from .modules import (
     ContextModule,
@@ -45,6 +48,74 @@ from .modules import (
 
 logger = logging.getLogger(__name__)
 
+# Entries per KnowledgeService query cache
+_QUERY_CACHE_SIZE = 512
+
+# Results searched per query; the narrower lookups (FAQ answer, pricing)
+# take the top of the same cached result list
+_SEARCH_RESULTS = 10
+
+# Conversation history formatting
+_HISTORY_HEADER = "📝 GESPREKSGESCHIEDENIS:\n"
+_ROLE_PREFIXES = {
+    'user': "👤 Klant: ",
+    'assistant': "🤖 Assistent: ",
+}
+
+
+class _LRUCache:
+    """Small thread-safe LRU mapping for per-query results."""
+    
+    def __init__(self, maxsize: int = _QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Any:
+        """Cached value for key (marking it recently used), or None."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class _CompiledKB:
+    """
+    Per-KB lookup data of a KnowledgeService, built once per KB refresh.
+    
+    update_kb_content swaps in a new instance with a single assignment, so
+    concurrent readers always see one consistent KB.
+    """
+    __slots__ = (
+        'kb_content', 'arrangements', 'arrangement_name_arena',
+        'arrangement_name_starts', 'module_output',
+    )
+    
+    def __init__(self, kb_content: KBContent):
+        self.kb_content = kb_content
+        # Lowercased arrangement names in KB order, NUL-joined into one
+        # string, so get_arrangement_info needs a single str.find
+        self.arrangements = list((kb_content or {}).get('arrangements', []))
+        self.arrangement_name_arena, self.arrangement_name_starts = _build_arena(
+            [arr.get('name', '').lower() for arr in self.arrangements]
+        )
+        # Rendered output of query-independent modules by id(module), with
+        # the module attributes it was rendered with; filled on first use
+        self.module_output: Dict[int, Tuple[Optional[Dict[str, Any]], str]] = {}
+
 
 class KnowledgeService:
     """
@@ -75,6 +146,7 @@ class KnowledgeService:
     ):
         self.kb_content = kb_content or {}
         self.tenant_id = tenant_id
+        self._kb = _CompiledKB(self.kb_content)
         
         # Initialize components
         self._search_engine = search_engine or KBSearchEngine(self.kb_content)
@@ -83,6 +155,12 @@ class KnowledgeService:
         
         # Module lookup by name
         self._module_map = {m.name: m for m in self._modules}
+        self._rebuild_module_index()
+        
+        # Per-query caches: search results by (query, max_results, min_score),
+        # signals by query. Search results depend on the KB, signals do not.
+        self._search_cache = _LRUCache()
+        self._signals_cache = _LRUCache()
         
         logger.info(
             f"KnowledgeService initialized with {len(self._modules)} modules"
@@ -97,8 +175,57 @@ class KnowledgeService:
         """
         self.kb_content = kb_content
         self._search_engine = KBSearchEngine(kb_content)
+        self._kb = _CompiledKB(kb_content)
+        self._search_cache.clear()
         logger.info("KB content updated")
     
+    def clear_caches(self):
+        """
+        Drop all cached search results and query signals.
+        
+        update_kb_content does this itself; call it after changing a custom
+        search engine or query analyzer in place.
+        """
+        self._search_cache.clear()
+        self._signals_cache.clear()
+    
+    def _cached_search(
+        self,
+        query: str,
+        max_results: int,
+        min_score: float = 0.0,
+    ) -> List[SearchResult]:
+        """
+        Search through the per-query result cache.
+        
+        Each call gets its own list of shallow result copies: callers may
+        add, replace or remove keys without touching the cache, but nested
+        values (metadata) are shared with it and must not be mutated.
+        """
+        return [dict(result) for result in self._cached_results(query, max_results, min_score)]
+    
+    def _cached_results(
+        self,
+        query: str,
+        max_results: int = _SEARCH_RESULTS,
+        min_score: float = 0.0,
+    ) -> List[SearchResult]:
+        """Search through the per-query result cache (shared list: read only)."""
+        key = (query, max_results, min_score)
+        results = self._search_cache.get(key)
+        if results is None:
+            results = self._search_engine.search(query, max_results=max_results, min_score=min_score)
+            self._search_cache.put(key, results)
+        return results
+    
+    def _cached_analyze(self, query: str) -> QuerySignals:
+        """Analyze a query through the per-query signals cache (returns a copy)."""
+        signals = self._signals_cache.get(query)
+        if signals is None:
+            signals = self._query_analyzer.analyze(query)
+            self._signals_cache.put(query, signals)
+        return dict(signals)
+    
     def register_module(self, module: ContextModule):
         """
         Register a custom module.
@@ -108,6 +235,7 @@ class KnowledgeService:
         """
         self._modules.append(module)
         self._module_map[module.name] = module
+        self._rebuild_module_index()
         logger.info(f"Module registered: {module.name}")
     
     def replace_module(self, name: str, module: ContextModule):
@@ -124,8 +252,60 @@ class KnowledgeService:
         # Add new module
         self._modules.append(module)
         self._module_map[module.name] = module
+        self._rebuild_module_index()
         logger.info(f"Module replaced: {name}")
     
+    def _rebuild_module_index(self):
+        """Index the modules (in render order) by their trigger signals."""
+        # Render order: most stable first (see ContextModule.stability), in
+        # registration order within the same stability; modules not derived
+        # from ContextModule count as query dependent (2)
+        self._modules_tuple = tuple(
+            sorted(self._modules, key=lambda m: getattr(m, 'stability', 2))
+        )
+        # Cached output is keyed by module id; a replaced module's id may be reused
+        self._kb.module_output.clear()
+        
+        # Positions of modules without triggers (always asked), and of the
+        # modules each signal can trigger. Modules not derived from
+        # ContextModule may lack trigger_signals; they are always asked.
+        self._untriggered_modules = frozenset(
+            i for i, m in enumerate(self._modules_tuple)
+            if getattr(m, 'trigger_signals', None) is None
+        )
+        modules_by_signal: Dict[str, List[int]] = {}
+        for i, module in enumerate(self._modules_tuple):
+            for signal in getattr(module, 'trigger_signals', None) or ():
+                modules_by_signal.setdefault(signal, []).append(i)
+        self._modules_by_signal = modules_by_signal
+    
+    def _active_modules(
+        self,
+        signals: QuerySignals,
+        include_modules: Optional[List[str]] = None,
+        exclude_modules: Optional[List[str]] = None,
+    ) -> tuple:
+        """
+        Modules in render order that can include themselves for these
+        signals, filtered by name.
+        """
+        positions = set(self._untriggered_modules)
+        modules_by_signal = self._modules_by_signal
+        for signal, value in signals.items():
+            if value and signal in modules_by_signal:
+                positions.update(modules_by_signal[signal])
+        
+        modules = self._modules_tuple
+        if not include_modules and not exclude_modules:
+            return tuple(modules[i] for i in sorted(positions))
+        
+        include = frozenset(include_modules) if include_modules else None
+        exclude = frozenset(exclude_modules) if exclude_modules else frozenset()
+        return tuple(
+            m for m in map(modules.__getitem__, sorted(positions))
+            if (include is None or m.name in include) and m.name not in exclude
+        )
+    
     def analyze_query(self, query: str) -> QuerySignals:
         """
         Analyze a query to extract signals.
@@ -136,7 +316,7 @@ class KnowledgeService:
         Returns:
             Query signals dictionary
         """
-        return self._query_analyzer.analyze(query)
+        return self._cached_analyze(query)
     
     def search(
         self,
@@ -155,11 +335,7 @@ class KnowledgeService:
         Returns:
             List of search results
         """
-        return self._search_engine.search(
-            query=query,
-            max_results=max_results,
-            min_score=min_score,
-        )
+        return self._cached_search(query, max_results, min_score)
     
     def get_context_for_llm(
         self,
@@ -189,60 +365,152 @@ class KnowledgeService:
             Formatted context string for LLM
         """
         # Analyze query
-        signals = self._query_analyzer.analyze(query)
-        logger.info(f"Query signals: {signals}")
+        signals = self._cached_analyze(query)
+        logger.info("Query signals: %s", signals)
         
         # Search KB
-        search_results = self._search_engine.search(query, max_results=10)
-        logger.info(f"Search returned {len(search_results)} results")
+        search_results = self._cached_search(query, _SEARCH_RESULTS)
+        logger.info("Search returned %d results", len(search_results))
         
         # Build context using modules
         context_parts = []
+        # Length of "\n".join(context_parts), tracked while rendering
+        context_length = -1
         
         # Add conversation history if provided
         if conversation_history:
             history_context = self._format_conversation_history(conversation_history)
             if history_context:
                 context_parts.append(history_context)
+                context_length += len(history_context) + 1
         
         # Prepare module context
         module_context = {
             'products': products or [],
             'activity_name': signals.get('detected_activity'),
             'query': query,  # Pass query for smart excerpt extraction
-            **(custom_context or {})
         }
+        if custom_context:
+            module_context.update(custom_context)
         
-        # Determine which modules to include
-        active_modules = self._modules
-        if include_modules:
-            active_modules = [m for m in self._modules if m.name in include_modules]
-        if exclude_modules:
-            active_modules = [m for m in active_modules if m.name not in exclude_modules]
-        
-        # Render each module
-        for module in active_modules:
+        # Render each included module
+        for module in self._active_modules(signals, include_modules, exclude_modules):
             try:
                 if module.should_include(signals, search_results=search_results, **module_context):
-                    content = module.render(
-                        self.kb_content,
-                        search_results,
-                        signals,
-                        **module_context
-                    )
+                    if getattr(module, 'is_query_independent', False):
+                        content = self._render_query_independent(module)
+                    else:
+                        content = module.render(
+                            self.kb_content,
+                            search_results,
+                            signals,
+                            **module_context
+                        )
                     if content and content.strip():
                         context_parts.append(content)
+                        context_length += len(content) + 1
             except Exception as e:
-                logger.error(f"Module {module.name} failed: {e}", exc_info=True)
+                logger.error("Module %s failed: %s", module.name, e, exc_info=True)
+            
+            # Everything rendered after this point would be truncated away
+            if context_length > max_context_length:
+                break
+        
+        if context_length <= max_context_length:
+            return "\n".join(context_parts)
+        
+        # Truncate: keep whole parts up to the limit and cut the part that
+        # crosses it, instead of joining everything and slicing the result
+        logger.warning(
+            "Context truncated from %d to %d (remaining modules skipped)",
+            context_length, max_context_length,
+        )
+        kept = []
+        position = 0  # Start of the current part in the joined context
+        for part in context_parts:
+            if position + len(part) >= max_context_length:
+                kept.append(part[:max_context_length - position])
+                break
+            kept.append(part)
+            position += len(part) + 1
+        return "\n".join(kept) + "\n\n[Context truncated...]"
+    
+    def _render_query_independent(self, module: ContextModule) -> str:
+        """
+        Render a query-independent module once per KB and configuration.
         
-        # Combine and truncate if needed
-        full_context = "\n".join(context_parts)
+        The output is reused while the module's attributes (e.g. max_items,
+        show_all) are unchanged; assigning a new value renders it again.
+        """
+        compiled = self._kb
+        config = getattr(module, '__dict__', None)
+        cached = compiled.module_output.get(id(module))
+        if cached is not None and cached[0] == config:
+            return cached[1]
+        content = module.render(compiled.kb_content, [], {})
+        compiled.module_output[id(module)] = (
+            dict(config) if config is not None else None, content
+        )
+        return content
+    
+    def get_context_for_llm_batch(
+        self,
+        queries: List[str],
+        products: List[Dict] = None,
+        conversation_history: List[Dict] = None,
+        custom_context: Dict[str, Any] = None,
+        max_context_length: int = 8000,
+        include_modules: List[str] = None,
+        exclude_modules: List[str] = None,
+    ) -> List[str]:
+        """
+        Get LLM context for several queries at once.
         
-        if len(full_context) > max_context_length:
-            logger.warning(f"Context truncated from {len(full_context)} to {max_context_length}")
-            full_context = full_context[:max_context_length] + "\n\n[Context truncated...]"
+        Searches for all queries not yet in the search cache go through one
+        search_batch call (identical queries are searched once); modules are
+        then rendered per query, sequentially, as in get_context_for_llm.
         
-        return full_context
+        Args:
+            queries: The user queries
+            (other args: see get_context_for_llm, shared by all queries)
+            
+        Returns:
+            One formatted context string per query, in the order of queries
+        """
+        self._prefetch_searches(queries, _SEARCH_RESULTS)
+        return [
+            self.get_context_for_llm(
+                query,
+                products=products,
+                conversation_history=conversation_history,
+                custom_context=custom_context,
+                max_context_length=max_context_length,
+                include_modules=include_modules,
+                exclude_modules=exclude_modules,
+            )
+            for query in queries
+        ]
+    
+    def _prefetch_searches(self, queries: List[str], max_results: int):
+        """Fill the search cache for all uncached queries in one batch."""
+        missing = [
+            query for query in dict.fromkeys(queries)
+            if self._search_cache.get((query, max_results, 0.0)) is None
+        ]
+        if not missing:
+            return
+        
+        search_batch = getattr(self._search_engine, 'search_batch', None)
+        if search_batch is not None:
+            batch_results = search_batch(missing, max_results=max_results)
+        else:
+            # Custom search engines without batch support
+            batch_results = [
+                self._search_engine.search(query, max_results=max_results)
+                for query in missing
+            ]
+        for query, results in zip(missing, batch_results):
+            self._search_cache.put((query, max_results, 0.0), results)
     
     def get_relevant_excerpt(
         self,
@@ -272,18 +540,12 @@ class KnowledgeService:
         if not history:
             return ""
         
-        recent = history[-max_turns:]
-        
-        parts = ["📝 GESPREKSGESCHIEDENIS:\n"]
-        for turn in recent:
-            role = turn.get('role', 'user')
-            content = turn.get('content', '')
-            
-            if role == 'user':
-                parts.append(f"👤 Klant: {content}\n")
-            elif role == 'assistant':
-                parts.append(f"🤖 Assistent: {content}\n")
-        
+        parts = [_HISTORY_HEADER]
+        for turn in history[-max_turns:]:
+            prefix = _ROLE_PREFIXES.get(turn.get('role', 'user'))
+            # Turns with other roles (e.g. system) are left out
+            if prefix is not None:
+                parts.append(f"{prefix}{turn.get('content', '')}\n")
         parts.append("\n")
         return "".join(parts)
     
@@ -297,7 +559,9 @@ class KnowledgeService:
         Returns:
             FAQ answer if found, None otherwise
         """
-        results = self._search_engine.search(query, max_results=3, min_score=0.5)
+        # Top 3 of the result list get_context_for_llm searches (and caches)
+        # for the same query; a match needs a score above 0.7 anyway
+        results = self._cached_results(query)[:3]
         
         # Look for high-confidence FAQ match
         for result in results:
@@ -308,8 +572,9 @@ class KnowledgeService:
                 
                 # Try to extract from content
                 content = result.get('content', '')
-                if 'ANTWOORD:' in content:
-                    return content.split('ANTWOORD:')[1].strip()
+                _, found, answer = content.partition('ANTWOORD:')
+                if found:
+                    return answer.strip()
                 
                 return content
         
@@ -325,17 +590,25 @@ class KnowledgeService:
         Returns:
             Arrangement dict if found, None otherwise
         """
-        arrangements = self.kb_content.get('arrangements', [])
         name_lower = arrangement_name.lower()
-        
-        for arr in arrangements:
-            if arr.get('name', '').lower() == name_lower:
-                return arr
-            # Also check partial match
-            if name_lower in arr.get('name', '').lower():
-                return arr
-        
-        return None
+        compiled = self._kb
+        
+        # First arrangement whose name matches exactly or contains the name
+        # (an exact match also contains it, so one test covers both)
+        if not compiled.arrangements:
+            return None
+        if '\0' in name_lower:
+            # Could match across two names in the arena
+            return next(
+                (arr for arr in compiled.arrangements if name_lower in arr.get('name', '').lower()),
+                None,
+            )
+        
+        # The first hit in the arena lies in the first matching name
+        pos = compiled.arrangement_name_arena.find(name_lower)
+        if pos < 0:
+            return None
+        return compiled.arrangements[bisect_right(compiled.arrangement_name_starts, pos) - 1]
     
     def get_activity_pricing(self, activity_name: str) -> Optional[Dict]:
         """
@@ -348,16 +621,14 @@ class KnowledgeService:
             Pricing dict if found in KB, None otherwise
         """
         # Search for activity in sections
-        results = self._search_engine.search(
-            f"{activity_name} prijs kosten",
-            max_results=3,
-        )
+        results = self._cached_results(f"{activity_name} prijs kosten")[:3]
         
         for result in results:
             if result.get('score', 0) > 0.5:
                 # Extract pricing from content
                 content = result.get('content', '')
-                if '€' in content or 'euro' in content.lower() or 'prijs' in content.lower():
+                content_lower = content.lower()
+                if '€' in content or 'euro' in content_lower or 'prijs' in content_lower:
                     return {
                         'activity': activity_name,
                         'content': content,
@@ -3,7 +3,9 @@ Tests for LLMContextBuilder
 """
 
 import pytest
-from maso_shared.kb import LLMContextBuilder, KBSearchEngine
+from maso_shared.kb import (
+    LLMContextBuilder, KBSearchEngine, KnowledgeService, ContextModule, KidsModule,
+)
 
 
 @pytest.fixture
@@ -208,3 +210,220 @@ class TestContextLength:
         context = context_builder.build_context(large_kb, [], signals, max_length=2000)
         
         assert len(context) <= 2100  # Allow small buffer for truncation
+
+
+class MarkerModule(ContextModule):
+    """Module that always wants to be included and renders a fixed marker."""
+
+    def __init__(self, name, stability=2, trigger_signals=None):
+        self._name = name
+        self.stability = stability
+        self.trigger_signals = trigger_signals
+
+    @property
+    def name(self):
+        return self._name
+
+    def should_include(self, signals, **kwargs):
+        return True
+
+    def render(self, kb_content, search_results, signals, **kwargs):
+        return f"[{self._name}]"
+
+
+class DuckModule:
+    """Module that does not subclass ContextModule (name/should_include/render only)."""
+
+    name = "duck"
+
+    def should_include(self, signals, **kwargs):
+        return True
+
+    def render(self, kb_content, search_results, signals, **kwargs):
+        return "[duck]"
+
+
+class AlwaysKidsModule(KidsModule):
+    """KidsModule subclass that overrides should_include without triggers."""
+
+    def should_include(self, signals, **kwargs):
+        return True
+
+
+class TestModuleSelection:
+    def test_module_skipped_without_trigger_signal(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        service.register_module(MarkerModule("marker", trigger_signals=frozenset({'kids'})))
+
+        assert "[marker]" not in service.get_context_for_llm("hoe laat zijn jullie open")
+        assert "[marker]" in service.get_context_for_llm("kinderfeestje")
+
+    def test_module_without_triggers_always_consulted(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        service.register_module(MarkerModule("marker"))
+
+        assert "[marker]" in service.get_context_for_llm("hoe laat zijn jullie open")
+
+    def test_subclass_overriding_should_include_drops_inherited_triggers(self, sample_kb_content):
+        assert KidsModule.trigger_signals == frozenset({'kids'})
+        assert AlwaysKidsModule.trigger_signals is None
+
+        service = KnowledgeService(sample_kb_content)
+        service.replace_module("kids", AlwaysKidsModule())
+        context = service.get_context_for_llm("hoe laat zijn jullie open")
+
+        assert "Kids Party" in context
+
+    def test_module_not_subclassing_context_module(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content, modules=[DuckModule()])
+
+        assert service.get_context_for_llm("hoe laat zijn jullie open") == "[duck]"
+
+    def test_module_not_subclassing_context_module_rendered_last(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        service.register_module(DuckModule())
+        context = service.get_context_for_llm("hoi")
+
+        assert context.index("Test Entertainment") < context.index("[duck]")
+
+    def test_registered_module_rendered_by_stability(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        service.register_module(MarkerModule("static", stability=0))
+        service.register_module(MarkerModule("dynamic"))
+        context = service.get_context_for_llm("hoi, hoe laat zijn jullie open?")
+
+        assert context.index("[static]") < context.index("Test Entertainment")
+        assert context.index("Test Entertainment") < context.index("[dynamic]")
+
+    def test_replaced_module_rendered_by_stability(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        service.register_module(MarkerModule("first"))
+        service.register_module(MarkerModule("second"))
+        service.replace_module("first", MarkerModule("first", stability=0))
+        context = service.get_context_for_llm("hoi")
+
+        assert context.index("[first]") < context.index("Test Entertainment")
+        assert context.index("Test Entertainment") < context.index("[second]")
+
+
+class TestQueryIndependentModules:
+    def test_changed_module_config_is_rendered_again(self):
+        kb = {'arrangements': [{'name': f'Arrangement {i}', 'price': ['€10,00']} for i in range(6)]}
+        service = KnowledgeService(kb)
+        arrangements = service._module_map['arrangements']
+        arrangements.show_all = False
+        assert "Arrangement 5" not in service.get_context_for_llm("welke arrangementen zijn er")
+
+        arrangements.show_all = True
+        assert "Arrangement 5" in service.get_context_for_llm("welke arrangementen zijn er")
+
+        arrangements.max_items = 4
+        assert "Arrangement 5" not in service.get_context_for_llm("welke arrangementen zijn er")
+
+    def test_output_reused_for_unchanged_config(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        first = service.get_context_for_llm("welke arrangementen zijn er")
+
+        assert service.get_context_for_llm("welke arrangementen zijn er") == first
+
+
+class CountingSearchEngine(KBSearchEngine):
+    """Search engine that records the queries it actually searches."""
+
+    def __init__(self, kb_content=None):
+        super().__init__(kb_content)
+        self.queries = []
+
+    def search(self, query, max_results=5, min_score=0.0):
+        self.queries.append(query)
+        return super().search(query, max_results=max_results, min_score=min_score)
+
+
+class TestServiceCaches:
+    def test_repeated_search_hits_cache(self, sample_kb_content):
+        engine = CountingSearchEngine(sample_kb_content)
+        service = KnowledgeService(sample_kb_content, search_engine=engine)
+
+        first = service.search("kinderfeestje")
+        second = service.search("kinderfeestje")
+
+        assert engine.queries == ["kinderfeestje"]
+        assert first == second
+
+    def test_update_kb_content_invalidates_results(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        assert not any('Laser Game' in r['title'] for r in service.search("laser game"))
+
+        updated = dict(sample_kb_content)
+        updated['arrangements'] = sample_kb_content['arrangements'] + [
+            {'name': 'Laser Game', 'description': 'Lasergamen in het donker', 'price': ['€20,00 p.p.']},
+        ]
+        service.update_kb_content(updated)
+
+        assert any('Laser Game' in r['title'] for r in service.search("laser game"))
+
+    def test_clear_caches_searches_again(self, sample_kb_content):
+        engine = CountingSearchEngine(sample_kb_content)
+        service = KnowledgeService(sample_kb_content, search_engine=engine)
+
+        service.search("kinderfeestje")
+        service.clear_caches()
+        service.search("kinderfeestje")
+
+        assert engine.queries == ["kinderfeestje", "kinderfeestje"]
+
+    def test_mutating_results_leaves_cache_untouched(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        results = service.search("kinderfeestje")
+        expected = [dict(r) for r in results]
+
+        results[0]['title'] = 'Gewijzigd'
+        results[0]['score'] = -1
+        results.clear()
+
+        assert service.search("kinderfeestje") == expected
+
+    def test_mutating_signals_leaves_cache_untouched(self, sample_kb_content):
+        service = KnowledgeService(sample_kb_content)
+        signals = service.analyze_query("kinderfeestje")
+        signals['kids'] = False
+
+        assert service.analyze_query("kinderfeestje")['kids'] == True
+
+
+class PlainSearchEngine:
+    """Custom search engine without search_batch."""
+
+    def __init__(self, kb_content):
+        self._engine = KBSearchEngine(kb_content)
+        self.queries = []
+
+    def search(self, query, max_results=5, min_score=0.0):
+        self.queries.append(query)
+        return self._engine.search(query, max_results=max_results, min_score=min_score)
+
+
+class TestContextBatch:
+    QUERIES = ["kinderfeestje", "hoe laat zijn jullie open", "bedrijfsuitje prijs", "kinderfeestje"]
+
+    def test_batch_matches_single_queries(self, sample_kb_content):
+        batch = KnowledgeService(sample_kb_content).get_context_for_llm_batch(self.QUERIES)
+        service = KnowledgeService(sample_kb_content)
+
+        assert batch == [service.get_context_for_llm(q) for q in self.QUERIES]
+
+    def test_duplicate_queries_searched_once(self, sample_kb_content):
+        engine = CountingSearchEngine(sample_kb_content)
+        service = KnowledgeService(sample_kb_content, search_engine=engine)
+        contexts = service.get_context_for_llm_batch(self.QUERIES)
+
+        assert sorted(engine.queries) == sorted(set(self.QUERIES))
+        assert contexts[0] == contexts[3]
+
+    def test_engine_without_search_batch(self, sample_kb_content):
+        engine = PlainSearchEngine(sample_kb_content)
+        service = KnowledgeService(sample_kb_content, search_engine=engine)
+        batch = service.get_context_for_llm_batch(self.QUERIES)
+
+        assert sorted(engine.queries) == sorted(set(self.QUERIES))
+        assert batch == [KnowledgeService(sample_kb_content).get_context_for_llm(q) for q in self.QUERIES]
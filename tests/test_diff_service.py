@@ -2,16 +2,18 @@
 Tests for KBDiffService
 """
 
+from collections import defaultdict
+
 import pytest
 from maso_shared.kb import KBDiffService
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def diff_service():
     return KBDiffService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_current_content():
     return {
         'faqs': [
@@ -32,7 +34,7 @@ def sample_current_content():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_scraped_content():
     return {
         'faqs': [
@@ -55,62 +57,52 @@ def sample_scraped_content():
     }
 
 
+@pytest.fixture(scope="module")
+def diff_result(diff_service, sample_current_content, sample_scraped_content):
+    # Shared by the tests, which only read it (apply_changes works on a deep copy)
+    return diff_service.generate_changes(sample_current_content, sample_scraped_content)
+
+
+@pytest.fixture(scope="module")
+def indexed_changes(diff_result):
+    """diff_result changes by (type, action), and by (type, None) for any action."""
+    index = defaultdict(list)
+    for change in diff_result['changes']:
+        index[(change['type'], change['action'])].append(change)
+        index[(change['type'], None)].append(change)
+    return index
+
+
+def _change_label(change):
+    """What a change is about: FAQ question (lowercased), arrangement name or business_info field."""
+    if change['type'] == 'faq':
+        return change['data']['question'].lower()
+    if change['type'] == 'arrangement':
+        return change['data']['name']
+    return change['field']
+
+
+# (change type, action or None for any, expected substring of the change label)
+DETECTED_CHANGES = [
+    ('faq', 'MODIFIED', 'openingstijden'),
+    ('faq', 'ADDED', 'parkeren'),
+    ('arrangement', 'MODIFIED', 'Kids Party'),
+    ('arrangement', 'REMOVED', 'Bedrijfsuitje'),
+    ('arrangement', 'ADDED', 'VIP'),
+    ('business_info', None, 'description'),
+]
+
+
 class TestGenerateChanges:
-    def test_detects_faq_modification(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
-        
-        faq_changes = [c for c in result['changes'] if c['type'] == 'faq']
-        modified_faqs = [c for c in faq_changes if c['action'] == 'MODIFIED']
-        
-        assert len(modified_faqs) == 1
-        assert 'openingstijden' in modified_faqs[0]['data']['question'].lower()
-    
-    def test_detects_faq_addition(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
-        
-        faq_changes = [c for c in result['changes'] if c['type'] == 'faq']
-        added_faqs = [c for c in faq_changes if c['action'] == 'ADDED']
-        
-        assert len(added_faqs) == 1
-        assert 'parkeren' in added_faqs[0]['data']['question'].lower()
-    
-    def test_detects_arrangement_modification(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
-        
-        arr_changes = [c for c in result['changes'] if c['type'] == 'arrangement']
-        modified_arr = [c for c in arr_changes if c['action'] == 'MODIFIED']
-        
-        assert len(modified_arr) == 1
-        assert 'Kids Party' in modified_arr[0]['data']['name']
-    
-    def test_detects_arrangement_removal(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
-        
-        arr_changes = [c for c in result['changes'] if c['type'] == 'arrangement']
-        removed_arr = [c for c in arr_changes if c['action'] == 'REMOVED']
-        
-        assert len(removed_arr) == 1
-        assert 'Bedrijfsuitje' in removed_arr[0]['data']['name']
-    
-    def test_detects_arrangement_addition(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
-        
-        arr_changes = [c for c in result['changes'] if c['type'] == 'arrangement']
-        added_arr = [c for c in arr_changes if c['action'] == 'ADDED']
-        
-        assert len(added_arr) == 1
-        assert 'VIP' in added_arr[0]['data']['name']
-    
-    def test_detects_business_info_modification(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
-        
-        biz_changes = [c for c in result['changes'] if c['type'] == 'business_info']
+    @pytest.mark.parametrize("change_type,action,label", DETECTED_CHANGES)
+    def test_detects_change(self, indexed_changes, change_type, action, label):
+        changes = indexed_changes[(change_type, action)]
         
-        assert len(biz_changes) == 1
-        assert biz_changes[0]['field'] == 'description'
+        assert len(changes) == 1
+        assert label in _change_label(changes[0])
     
-    def test_summary_counts_correct(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
+    def test_summary_counts_correct(self, diff_result):
+        result = diff_result
         
         summary = result['summary']
         
@@ -131,11 +123,11 @@ class TestGenerateChanges:
 
 
 class TestApplyChanges:
-    def test_apply_faq_addition(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
+    def test_apply_faq_addition(self, diff_service, sample_current_content, diff_result, indexed_changes):
+        result = diff_result
         
         # Find the added FAQ change
-        added_faq = next(c for c in result['changes'] if c['type'] == 'faq' and c['action'] == 'ADDED')
+        added_faq = indexed_changes[('faq', 'ADDED')][0]
         
         # Apply just this change
         new_content = diff_service.apply_changes(
@@ -145,13 +137,14 @@ class TestApplyChanges:
         )
         
         assert len(new_content['faqs']) == 3
-        assert any('parkeren' in faq['question'].lower() for faq in new_content['faqs'])
+        questions = "\n".join(faq['question'].lower() for faq in new_content['faqs'])
+        assert 'parkeren' in questions
     
-    def test_apply_arrangement_removal(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
+    def test_apply_arrangement_removal(self, diff_service, sample_current_content, diff_result, indexed_changes):
+        result = diff_result
         
         # Find the removed arrangement change
-        removed_arr = next(c for c in result['changes'] if c['type'] == 'arrangement' and c['action'] == 'REMOVED')
+        removed_arr = indexed_changes[('arrangement', 'REMOVED')][0]
         
         # Apply just this change
         new_content = diff_service.apply_changes(
@@ -161,12 +154,14 @@ class TestApplyChanges:
         )
         
         assert len(new_content['arrangements']) == 1
-        assert not any('Bedrijfsuitje' in arr['name'] for arr in new_content['arrangements'])
+        names = "\n".join(arr['name'] for arr in new_content['arrangements'])
+        assert 'Bedrijfsuitje' not in names
 
 
 class TestChangeIdGeneration:
-    def test_change_ids_are_deterministic(self, diff_service, sample_current_content, sample_scraped_content):
-        result1 = diff_service.generate_changes(sample_current_content, sample_scraped_content)
+    def test_change_ids_are_deterministic(self, diff_service, sample_current_content, sample_scraped_content, diff_result):
+        # Compare the shared result with one fresh full diff (not the fingerprint fast path)
+        result1 = diff_result
         result2 = diff_service.generate_changes(sample_current_content, sample_scraped_content)
         
         ids1 = sorted([c['change_id'] for c in result1['changes']])
@@ -174,8 +169,8 @@ class TestChangeIdGeneration:
         
         assert ids1 == ids2
     
-    def test_change_ids_are_unique(self, diff_service, sample_current_content, sample_scraped_content):
-        result = diff_service.generate_changes(sample_current_content, sample_scraped_content)
+    def test_change_ids_are_unique(self, diff_result):
+        result = diff_result
         
         ids = [c['change_id'] for c in result['changes']]
         
@@ -0,0 +1,108 @@
+"""
+Tests for QueryAnalyzer
+"""
+
+import pytest
+from maso_shared.kb import QueryAnalyzer
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return QueryAnalyzer()
+
+
+class TestSignals:
+    @pytest.mark.parametrize("query", [
+        "ik heb een notenallergie",
+        "sojaallergie",
+        "pindaallergie ok?",
+        "vegetarische opties",
+        "glutenvrije pizza",
+    ])
+    def test_allergy_fires_on_compounds(self, analyzer, query):
+        assert analyzer.analyze(query)['allergy'] == True
+
+    @pytest.mark.parametrize("query,signal", [
+        ("hoeveel kost de goedkoopste optie", 'pricing'),
+        ("kan ik betalen in euros", 'pricing'),
+        ("kidsparty boeken", 'kids'),
+        ("etentje met collega's", 'food'),
+        ("wanneer opent de bowling", 'opening_hours'),
+    ])
+    def test_compounds_and_inflections_fire(self, analyzer, query, signal):
+        assert analyzer.analyze(query)[signal] == True
+
+    @pytest.mark.parametrize("query,signal", [
+        ("hoe lang duurt het bowlen", 'opening_hours'),
+        ("hoe lang duurt het bowlen", 'pricing'),
+        ("ik wil het graag weten", 'food'),
+        ("waarom is het zo druk", 'location'),
+        ("kan ik er met het openbaar vervoer komen", 'opening_hours'),
+    ])
+    def test_whole_words_do_not_fire_inside_other_words(self, analyzer, query, signal):
+        assert analyzer.analyze(query)[signal] == False
+
+    def test_whole_words_still_fire(self, analyzer):
+        signals = analyzer.analyze("wat is duur en hoe laat zijn jullie open")
+
+        assert signals['pricing'] == True
+        assert signals['opening_hours'] == True
+
+
+class TestCustomPatterns:
+    PATTERNS = {
+        'golf': ['golf', 'midgetgolf', 'putten'],
+        'escape': ['escape', 'escaperoom', 'puzzel'],
+    }
+    SYNONYMS = {
+        'midgetgolf': ['midgetgolf', 'minigolf'],
+        'escaperoom': ['escape room', 'escaperoom'],
+    }
+
+    def test_detect_categories_with_custom_patterns(self):
+        analyzer = QueryAnalyzer(category_patterns=self.PATTERNS)
+
+        assert analyzer.detect_categories("kunnen we midgetgolf spelen") == ['golf']
+        assert analyzer.detect_categories("escaperoom met puzzel") == ['escape']
+        assert analyzer.detect_categories("wat kost bowlen") == []
+
+    def test_detect_activity_with_custom_synonyms(self):
+        analyzer = QueryAnalyzer(activity_synonyms=self.SYNONYMS)
+
+        assert analyzer.analyze("minigolf voor 6 personen")['detected_activity'] == 'midgetgolf'
+        assert analyzer.analyze("is er een escape room")['detected_activity'] == 'escaperoom'
+        assert analyzer.analyze("wat kost bowlen")['activity'] == False
+
+    def test_assigned_patterns_are_used(self):
+        analyzer = QueryAnalyzer()
+        analyzer.category_patterns = self.PATTERNS
+        analyzer.activity_synonyms = self.SYNONYMS
+
+        assert analyzer.detect_categories("midgetgolf") == ['golf']
+        assert analyzer.analyze("minigolf")['detected_activity'] == 'midgetgolf'
+
+    def test_patterns_extended_in_place(self):
+        analyzer = QueryAnalyzer()
+        analyzer.category_patterns['golf'] = ['midgetgolf']
+        analyzer.activity_synonyms['midgetgolf'] = ['midgetgolf', 'minigolf']
+
+        assert analyzer.detect_categories("midgetgolf") == ['golf']
+        assert analyzer.analyze("minigolf")['detected_activity'] == 'midgetgolf'
+
+    def test_keyword_lists_edited_in_place(self):
+        patterns = {name: list(words) for name, words in self.PATTERNS.items()}
+        synonyms = {name: list(words) for name, words in self.SYNONYMS.items()}
+        analyzer = QueryAnalyzer(category_patterns=patterns, activity_synonyms=synonyms)
+        assert analyzer.detect_categories("darten") == []
+
+        patterns['escape'].append('darten')
+        synonyms['escaperoom'].append('uitbraak')
+
+        assert analyzer.detect_categories("darten") == ['escape']
+        assert analyzer.analyze("uitbraak")['detected_activity'] == 'escaperoom'
+
+    def test_in_place_edits_do_not_leak_into_defaults(self):
+        edited = QueryAnalyzer()
+        edited.category_patterns['golf'] = ['midgetgolf']
+
+        assert QueryAnalyzer().detect_categories("midgetgolf") == []
@@ -2,16 +2,19 @@
 Tests for KBSearchEngine
 """
 
+import copy
+
 import pytest
-from maso_shared.kb import KBSearchEngine
+from maso_shared.kb import KBSearchEngine, extract_relevant_excerpt
+from maso_shared.kb.search import clear_index_cache
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def search_engine():
     return KBSearchEngine()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_kb_content():
     return {
         'faqs': [
@@ -101,30 +104,19 @@ class TestSearch:
         arrangement_results = [r for r in results if r.get('is_arrangement')]
         assert len(arrangement_results) > 0
     
-    def test_kids_query_boosts_kids_content(self, search_engine, sample_kb_content):
-        results = search_engine.search(sample_kb_content, "kinderfeestje")
+    def test_kids_query_boosts_kids_content(self, sample_kb_content):
+        results = KBSearchEngine(sample_kb_content).search("kinderfeestje")
         
-        # Should find kids-related content
-        found_kids = False
-        for r in results:
-            content = (r.get('title', '') + r.get('content', '')).lower()
-            if 'kids' in content or 'kinder' in content:
-                found_kids = True
-                break
+        # Should find kids-related content (one lowercased text over all results)
+        texts = "\n".join(r.get('title', '') + r.get('content', '') for r in results).lower()
         
-        assert found_kids
+        assert 'kids' in texts or 'kinder' in texts
     
-    def test_simracen_query_finds_racing_content(self, search_engine, sample_kb_content):
-        results = search_engine.search(sample_kb_content, "simracen leeftijd")
+    def test_simracen_query_finds_racing_content(self, sample_kb_content):
+        results = KBSearchEngine(sample_kb_content).search("simracen leeftijd")
         
         # Should find FAQ about simracen leeftijd
-        found_simracen = False
-        for r in results:
-            if r.get('is_faq') and 'simracen' in r.get('title', '').lower():
-                found_simracen = True
-                break
-        
-        assert found_simracen
+        assert any(r.get('is_faq') and 'simracen' in r.get('title', '').lower() for r in results)
     
     def test_max_sections_limits_results(self, search_engine, sample_kb_content):
         results = search_engine.search(sample_kb_content, "test", max_sections=2)
@@ -132,34 +124,99 @@ class TestSearch:
         assert len(results) <= 2
 
 
+class TestSearchBatch:
+    def test_returns_results_in_query_order(self, sample_kb_content):
+        engine = KBSearchEngine(sample_kb_content)
+        queries = ['openingstijden', 'kinderfeestje', 'openingstijden']
+        results = engine.search_batch(queries)
+
+        assert len(results) == 3
+        for query, query_results in zip(queries, results):
+            assert query_results == engine.search(query)
+
+    def test_duplicate_queries_get_separate_lists(self, sample_kb_content):
+        engine = KBSearchEngine(sample_kb_content)
+        first, second = engine.search_batch(['kinderfeestje', 'kinderfeestje'])
+
+        assert first is not second
+
+    def test_empty_batch(self, sample_kb_content):
+        assert KBSearchEngine(sample_kb_content).search_batch([]) == []
+
+
+_ZWEMBAD_FAQ = {
+    'question': 'Hebben jullie een zwembad?',
+    'answer': 'Nee, wel een terras.',
+    'category': 'faciliteiten',
+}
+
+
+def _finds_zwembad(engine):
+    return any('zwembad' in r.get('question', '').lower() for r in engine.search('zwembad'))
+
+
+class TestIndexCache:
+    def test_engines_on_same_kb_give_same_results(self, sample_kb_content):
+        first = KBSearchEngine(sample_kb_content)
+        second = KBSearchEngine(sample_kb_content)
+
+        assert second.search('kinderfeestje') == first.search('kinderfeestje')
+
+    def test_results_unchanged_after_clear_index_cache(self, sample_kb_content):
+        before = KBSearchEngine(sample_kb_content).search('openingstijden')
+        clear_index_cache()
+
+        assert KBSearchEngine(sample_kb_content).search('openingstijden') == before
+
+    def test_appended_documents_are_found(self, sample_kb_content):
+        # Own copy: the fixture is shared by the whole module
+        sample_kb_content = copy.deepcopy(sample_kb_content)
+        KBSearchEngine(sample_kb_content)
+        sample_kb_content['faqs'].append(dict(_ZWEMBAD_FAQ))
+
+        assert _finds_zwembad(KBSearchEngine(sample_kb_content))
+
+    def test_in_place_edits_are_found_after_reassigning(self, sample_kb_content):
+        sample_kb_content = copy.deepcopy(sample_kb_content)
+        engine = KBSearchEngine(sample_kb_content)
+        sample_kb_content['faqs'][0].update(_ZWEMBAD_FAQ)
+        engine.kb_content = sample_kb_content
+
+        assert _finds_zwembad(engine)
+        assert _finds_zwembad(KBSearchEngine(sample_kb_content))
+
+    def test_reassigned_kb_is_searched(self, sample_kb_content):
+        engine = KBSearchEngine(sample_kb_content)
+        engine.kb_content = {'faqs': [dict(_ZWEMBAD_FAQ)]}
+
+        assert _finds_zwembad(engine)
+        assert engine.search('kinderfeestje') == []
+
+    def test_excerpts_same_for_indexed_and_other_content(self):
+        content = "Inleiding. " * 100 + "Het Zwembad is open in de zomer. " + "Slot. " * 100
+        expected = extract_relevant_excerpt(content, "zwembad", context_chars=40, before_chars=20)
+        assert "Zwembad" in expected
+
+        KBSearchEngine({'content_sections': [{'title': 'Zwemmen', 'content': content}]})
+        assert extract_relevant_excerpt(content, "zwembad", context_chars=40, before_chars=20) == expected
+
+        clear_index_cache()
+        assert extract_relevant_excerpt(content, "zwembad", context_chars=40, before_chars=20) == expected
+
+
 class TestQuerySignals:
-    def test_detects_kids_signal(self, search_engine):
-        signals = search_engine.analyze_query_signals("kinderfeestje prijzen")
-        
-        assert signals['kids'] == True
-        assert signals['pricing'] == True
-    
-    def test_detects_bedrijf_signal(self, search_engine):
-        signals = search_engine.analyze_query_signals("bedrijfsuitje teambuilding")
-        
-        assert signals['bedrijf'] == True
-    
-    def test_detects_arrangement_signal(self, search_engine):
-        signals = search_engine.analyze_query_signals("welke arrangementen hebben jullie")
-        
-        assert signals['arrangement'] == True
-    
-    def test_detects_opening_hours_signal(self, search_engine):
-        signals = search_engine.analyze_query_signals("wanneer zijn jullie open")
-        
-        assert signals['opening_hours'] == True
-    
-    def test_detects_multiple_signals(self, search_engine):
-        signals = search_engine.analyze_query_signals("wat kost een kinderfeestje arrangement")
-        
-        assert signals['kids'] == True
-        assert signals['pricing'] == True
-        assert signals['arrangement'] == True
+    @pytest.mark.parametrize("query,expected", [
+        ("kinderfeestje prijzen", {'kids': True, 'pricing': True}),
+        ("bedrijfsuitje teambuilding", {'bedrijf': True}),
+        ("welke arrangementen hebben jullie", {'arrangement': True}),
+        ("wanneer zijn jullie open", {'opening_hours': True}),
+        ("wat kost een kinderfeestje arrangement", {'kids': True, 'pricing': True, 'arrangement': True}),
+    ])
+    def test_detects_signals(self, search_engine, query, expected):
+        signals = search_engine.analyze_query_signals(query)
+        
+        for signal, value in expected.items():
+            assert signals[signal] == value
 
 
 class TestQueryExpansion: